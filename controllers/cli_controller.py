@@ -0,0 +1,193 @@
+import csv
+import sys
+from contextlib import nullcontext
+from dataclasses import fields
+from datetime import date, timedelta
+
+from engine.client_store import ClientStore
+from engine.employee_store import EmployeeStore
+from engine.schedule_engine import ScheduleEngine
+from utils.client_import import import_clients
+from utils.data_gateway import DataGateway
+
+BOOKING_HEADER = ["date", "employee", "slot", "client"]
+
+#non-interactive entry points for scripts and nightly jobs (python main.py <command> ...).
+#They call the services directly and print plain text, nothing gets drawn or asked.
+#run() returns the exit code: 0 done, 1 something was refused (conflicts, rejected rows).
+class CLIController():
+
+    #adds the subcommands to main.py's parser
+    @staticmethod
+    def add_commands(parser):
+        commands = parser.add_subparsers(dest="command", metavar="COMMAND", help="run without the menu: book, cancel, export, import, report")
+
+        for name, verb in (("book", "Book"), ("cancel", "Cancel")):
+            command = commands.add_parser(name, help=f"{verb.lower()} appointments, all or none")
+            command.add_argument("--client", help="client id")
+            command.add_argument("--employee", help="employee id or internal id")
+            command.add_argument("--date", type=_day, help="YYYY-MM-DD")
+            command.add_argument("--slots", type=_list, default=[], help="comma separated, e.g. 10:00,10:30")
+            command.add_argument("--weeks", type=int, default=1, help="repeat weekly this many times (default: 1)")
+            command.add_argument("--file", help=f"csv with {','.join(BOOKING_HEADER)} columns instead of the options above")
+
+        command = commands.add_parser("export", help="write clients, employees or appointments as csv")
+        command.add_argument("what", choices=("clients", "employees", "appointments"))
+        command.add_argument("--out", help="file to write (default: stdout)")
+        command.add_argument("--from", dest="start", type=_day, help="appointments since YYYY-MM-DD")
+        command.add_argument("--to", dest="end", type=_day, help="appointments until YYYY-MM-DD")
+
+        command = commands.add_parser("import", help="merge a csv of clients into clients.csv")
+        command.add_argument("path", help="csv with id,name,last_name,dob,phone columns")
+        command.add_argument("--report", help="where to write the rejected rows (default: <path>.errors.csv)")
+
+        command = commands.add_parser("report", help="birthdays or appointments as plain text")
+        command.add_argument("what", choices=("birthdays", "appointments"))
+        command.add_argument("--date", type=_day, help="first day (default: today)")
+        command.add_argument("--days", type=int, default=7, help="how many days (default: 7)")
+        command.add_argument("--employee", help="only this employee (appointments)")
+
+    def __init__(self, args, out=None):
+        self.args = args
+        self.out = out or sys.stdout
+        self.schedule = ScheduleEngine()
+        self.clients = ClientStore()
+        self.employees = EmployeeStore()
+
+    def run(self):
+        actions = {
+            "book": self.book,
+            "cancel": self.cancel,
+            "export": self.export,
+            "import": self.import_clients,
+            "report": self.report,
+        }
+
+        try:
+            return actions[self.args.command]()
+        except (ValueError, OSError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+
+    #----------------------------------------------
+    #----------------COMMANDS--------------------
+    #----------------------------------------------
+    def book(self):
+        bookings = self._bookings()
+        return self._report_changes(bookings, self.schedule.book_many(bookings), "Booked")
+
+    def cancel(self):
+        bookings = self._bookings()
+        return self._report_changes(bookings, self.schedule.cancel_many(bookings), "Cancelled")
+
+    def export(self):
+        args = self.args
+
+        with (open(args.out, "w", encoding="utf-8", newline="") if args.out else nullcontext(self.out)) as f:
+            if args.what == "appointments":
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(BOOKING_HEADER)
+                rows = self.schedule.find_appointments(start=args.start, end=args.end)
+                writer.writerows(rows)
+            else:
+                store = self.clients if args.what == "clients" else self.employees
+                model = store.model_class
+                rows = store.items
+                writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(model) if field.init], lineterminator="\n")
+                writer.writeheader()
+                writer.writerows(DataGateway.to_row(obj) for obj in rows)
+
+        if args.out:
+            print(f"{len(rows)} {args.what} written to {args.out}.", file=self.out)
+        return 0
+
+    def import_clients(self):
+        added, rejected, report_path = import_clients(self.args.path, self.args.report)
+
+        print(f"{added} client(s) imported, {rejected} rejected.", file=self.out)
+        if rejected:
+            print(f"See {report_path}", file=sys.stderr)
+            return 1
+        return 0
+
+    def report(self):
+        start = self.args.date or date.today()
+        end = start + timedelta(days=max(self.args.days, 1) - 1)
+
+        if self.args.what == "birthdays":
+            print(f"Birthday gift active on {start}:", file=self.out)
+            for p in self.clients.active_gifts(start):
+                print(f"  {p.last_name}, {p.name} ({p.id}) | {p.dob} | {p.phone}", file=self.out)
+
+            print(f"Birthdays from {start} to {end}:", file=self.out)
+            for day, p in self.clients.upcoming_birthdays(self.args.days, start):
+                print(f"  {day:%a %Y-%m-%d} {p.last_name}, {p.name} ({p.id}) | {p.phone}", file=self.out)
+            return 0
+
+        employee = self._employee(self.args.employee) if self.args.employee else None
+
+        rows = self.schedule.find_appointments(employee=employee, start=start, end=end)
+        for day, lines in self.schedule.group_appointments(rows).items():
+            print(day, file=self.out)
+            for line in lines:
+                print(f"  {line}", file=self.out)
+
+        print(f"{len(rows)} appointment(s) from {start} to {end}.", file=self.out)
+        return 0
+
+    #----------------------------------------------
+    #----------------HELPERS--------------------
+    #----------------------------------------------
+    #(date, employee internal_id, slot, client_id) from the options or from --file
+    def _bookings(self):
+        args = self.args
+
+        if args.file:
+            with open(args.file, "r", encoding="utf-8", newline="") as f:
+                try:
+                    rows = [tuple(row[name] for name in BOOKING_HEADER) for row in csv.DictReader(f)]
+                except KeyError as e:
+                    raise ValueError(f"{args.file} has no {e} column.")
+        else:
+            if not (args.client and args.employee and args.date and args.slots):
+                raise ValueError("--client, --employee, --date and --slots are required (or --file).")
+            rows = self.schedule.recurrence(args.date, args.employee, args.slots, args.client, count=max(args.weeks, 1))
+
+        if not rows:
+            raise ValueError("Nothing to book.")
+
+        #employees are resolved once per distinct value, not once per row
+        employees = {}
+        bookings = []
+        for day, emp, slot, client_id in rows:
+            if emp not in employees:
+                employees[emp] = self._employee(emp).internal_id
+            if not self.clients.get(client_id):
+                raise ValueError(f"Unknown client {client_id}.")
+            bookings.append((_day(day), employees[emp], slot, client_id))
+
+        return bookings
+
+    def _report_changes(self, bookings, conflicts, done):
+        if conflicts:
+            print(f"Nothing was saved, {len(conflicts)} conflict(s):", file=sys.stderr)
+            for (day, emp_id, slot, client_id), reason in conflicts:
+                print(f"  {day} {emp_id} {slot} {client_id}: {reason}", file=sys.stderr)
+            return 1
+
+        print(f"{done} {len(bookings)} appointment(s).", file=self.out)
+        return 0
+
+    #employees can be given by id or internal id
+    def _employee(self, value):
+        person = self.employees.resolve(value)
+        if person is None:
+            raise ValueError(f"Unknown employee {value}.")
+        return person
+
+
+def _day(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value).strip())
+
+def _list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
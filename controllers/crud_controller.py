@@ -15,6 +15,7 @@ class CRUDController():
             ("3", f"Update existing {self.name}"),
             ("4", f"Delete existing {self.name}"),
             ("5", f"Search for {self.name}"),
+            *[(key, label) for key, label, _ in self._extra_actions()],
             ("Q", "Go back to the main menu")
         ]
 
@@ -35,6 +36,7 @@ class CRUDController():
             "4": self.service.delete,
             "5": self.service.search
         }
+        actions.update({key: handler for key, _, handler in self._extra_actions()})
         action = actions.get(choice)
         
         try:
@@ -42,4 +44,7 @@ class CRUDController():
                 action()
         except Exception as e:
             ui.throw_exception("Exception", e)
-            
\ No newline at end of file
+
+    #services can add their own entries as (key, label, handler)
+    def _extra_actions(self):
+        return getattr(self.service, "extra_actions", [])
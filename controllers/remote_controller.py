@@ -0,0 +1,82 @@
+from datetime import date
+
+from utils.booking_server import ServerError
+
+#front desk menu for a terminal connected to the booking server (main.py --connect).
+#It doesn't load any data, every screen is a request to the server.
+class RemoteController():
+    def __init__(self, client, ui):
+        self.client = client
+        self.ui = ui
+
+    def run_menu(self):
+        actions = {
+            "1": self.book,
+            "2": self.cancel,
+            "3": self.availability,
+            "4": self.search,
+        }
+
+        while True:
+            choice = self.ui.simple_menu("Booking terminal", f"Connected to {self.client.path}", [
+                ("1", "Book appointment"),
+                ("2", "Cancel appointment"),
+                ("3", "Availability"),
+                ("4", "Search clients"),
+                ("Q", "Exit"),
+            ])
+            if choice == "Q":
+                return
+
+            try:
+                actions[choice]()
+            except ServerError as e:
+                self.ui.warning_message(str(e))
+                self.ui.pause()
+            except ConnectionError as e:
+                self.ui.throw_exception("Lost the booking server", e)
+                return
+
+    def book(self):
+        self._change("book", "Booked")
+
+    def cancel(self):
+        self._change("cancel", "Cancelled")
+
+    def availability(self):
+        day = self._ask_date()
+        result = self.client.request("availability", date=day)
+        self.ui.paginate_sectioned({
+            f"{day} | {emp_id}": [", ".join(slots) or "Fully booked"] for emp_id, slots in result.items()
+        })
+
+    def search(self):
+        query = self.ui.prompt_user("Client id, phone or name")
+        rows = self.client.request("search", query=query)
+        self.ui.paginate_sectioned({
+            f"Results for '{query}'": [
+                f"{r['last_name']}, {r['name']} ({r['id']}) | {r['phone']}" for r in rows
+            ] or ["No match found."]
+        })
+
+    def _change(self, op, done):
+        client = self.ui.prompt_user("Client ID")
+        employee = self.ui.prompt_user("Employee ID")
+        day = self._ask_date()
+        slots = [s.strip() for s in self.ui.prompt_user("Slots (e.g. 10:00,10:30)").split(",") if s.strip()]
+
+        result = self.client.request(op, client=client, employee=employee, date=day, slots=slots)
+        if result["conflicts"]:
+            self.ui.paginate_sectioned({
+                f"Nothing was saved, {len(result['conflicts'])} conflict(s)": [
+                    f"{c['date']} {c['slot']} → {c['reason']}" for c in result["conflicts"]
+                ]
+            })
+            return
+
+        self.ui.show_message(f"{done} {result['done']} appointment(s).")
+        self.ui.pause()
+
+    def _ask_date(self):
+        value = self.ui.prompt_user(f"Date (YYYY-MM-DD, empty = {date.today()})")
+        return value.strip() or date.today().isoformat()
@@ -0,0 +1,20 @@
+from datetime import date
+
+from engine.person_store import PersonStore
+from repository.models.client import Client
+from utils.global_state import GlobalState
+
+class ClientStore(PersonStore):
+
+    def __init__(self):
+        super().__init__("clients", Client)
+
+    #clients with a running birthday gift (free haircut) on day
+    def active_gifts(self, day=None):
+        GlobalState.initialize()
+        return GlobalState.birthday_indexes["clients"].active_gifts(day or date.today())
+
+    #(birthday, client) for the next days days, today included
+    def upcoming_birthdays(self, days=7, start=None):
+        GlobalState.initialize()
+        return GlobalState.birthday_indexes["clients"].upcoming(start or date.today(), days)
@@ -0,0 +1,13 @@
+from engine.person_store import PersonStore
+from repository.models.employee import Employee
+from utils.global_state import GlobalState
+
+class EmployeeStore(PersonStore):
+
+    def __init__(self):
+        super().__init__("employees", Employee)
+
+    #by id or internal id, None if there's no such employee
+    def resolve(self, value):
+        GlobalState.initialize()
+        return GlobalState.lookup("employees", "internal_id", value) or GlobalState.lookup("employees", "id", value)
@@ -0,0 +1,125 @@
+from dataclasses import fields
+
+from utils.global_state import GlobalState
+from utils.data_gateway import DataGateway
+
+#clients or employees without any UI: lookups, validation and the changes themselves.
+#Nothing is loaded until the first call that needs the data. Changes return an error message
+#(or None when they went through), whoever is calling decides how to show it.
+class PersonStore:
+
+    def __init__(self, state_key, model_class):
+        self.state_key = state_key
+        self.model_class = model_class
+
+    @property
+    def items(self):
+        GlobalState.initialize()
+        return getattr(GlobalState, self.state_key)
+
+    @property
+    def search_index(self):
+        GlobalState.initialize()
+        return GlobalState.search_indexes[self.state_key]
+
+    def get(self, id):
+        GlobalState.initialize()
+        return GlobalState.lookup(self.state_key, "id", id)
+
+    #ranked matches for query (exact id, phone prefix, then names allowing typos)
+    def find(self, query, limit=10):
+        return self.search_index.find(query, limit)
+
+    #what the record looks like now, to check on save that nobody changed it meanwhile
+    def version_of(self, target):
+        return GlobalState.version_of(self.state_key, target.id)
+
+    def validate_field(self, field, value):
+        error = self.model_class.check_field(field, value)
+        if error:
+            return error
+
+        GlobalState.initialize()
+
+        # uniqueness check
+        if field == "id" and GlobalState.lookup(self.state_key, "id", value):
+            return "Someone with this ID already exists."
+
+        if field == "phone" and GlobalState.lookup(self.state_key, "phone", value):
+            return "This phone number is already registered."
+
+        return None
+
+    def add(self, obj):
+        items = self.items
+
+        with GlobalState.transaction():
+            #another terminal may have registered the same id/phone while we were typing
+            error = self.validate_field("id", obj.id) or self.validate_field("phone", obj.phone)
+            if error:
+                return error
+
+            items.append(obj)
+            GlobalState.index(self.state_key, obj)
+            self._record_upsert(obj.id, obj)
+            self._propagate_changes(None, obj)
+
+        return None
+
+    #version is version_of(target) from when the user picked it
+    def update(self, target, updates, version):
+        with GlobalState.transaction():
+            if self._changed_elsewhere(target, version):
+                return self._changed_elsewhere_message()
+
+            #a reload may have swapped the object for an identical one, the change goes to the live one
+            target = GlobalState.lookup(self.state_key, "id", target.id)
+            before = self.model_class(**{f.name: getattr(target, f.name) for f in fields(self.model_class) if f.init})
+
+            for field, value in updates.items():
+                setattr(target, field, value)
+
+            if hasattr(target, "internal_id"):
+                target.internal_id = f"{target.prefix}{target.id}"
+
+            GlobalState.unindex(self.state_key, target, source=before)
+            GlobalState.index(self.state_key, target)
+
+            self._record_upsert(before.id, target)
+            self._propagate_changes(before, target)
+
+        return None
+
+    def remove(self, target, version):
+        items = self.items
+
+        with GlobalState.transaction():
+            if self._changed_elsewhere(target, version):
+                return self._changed_elsewhere_message()
+
+            target = GlobalState.lookup(self.state_key, "id", target.id)
+            items.remove(target)
+            GlobalState.unindex(self.state_key, target)
+            GlobalState.record("remove", store=self.state_key, id=target.id)
+            GlobalState.mark_dirty(self.state_key)
+            self._propagate_changes(target, None)
+
+        return None
+
+    #the schedule follows the people in it (deleted client -> slots freed, new id -> moved)
+    def _propagate_changes(self, before, after):
+        from engine.schedule_engine import ScheduleEngine
+
+        ScheduleEngine().apply_changes(before=before, after=after)
+
+    def _record_upsert(self, key, obj):
+        GlobalState.record("upsert", store=self.state_key, id=key, row=DataGateway.to_row(obj))
+        GlobalState.mark_dirty(self.state_key)
+
+    #optimistic check for update/delete: the record with that id has to be at the same version
+    #as when the user picked it (another terminal may have edited or deleted it meanwhile)
+    def _changed_elsewhere(self, target, version):
+        return not version or GlobalState.version_of(self.state_key, target.id) != version
+
+    def _changed_elsewhere_message(self):
+        return f"This {self.model_class.__name__.lower()} was changed from another terminal. Nothing was saved, try again."
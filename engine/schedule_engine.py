@@ -0,0 +1,275 @@
+from datetime import date, datetime, timedelta
+
+from repository.models.schedule import Schedule, FREE, SLOTS
+from repository.models.employee import Employee
+from utils.year_builder import get_calendar, is_working_day
+from utils.global_state import GlobalState
+
+#the booking rules without any UI: searches, openings, all-or-none bookings and the schedule
+#side of client/employee changes. ScheduleService draws the menus on top of it, the booking
+#server and the headless commands use it directly.
+#Nothing is loaded until the first call that needs the schedule.
+class ScheduleEngine:
+    def __init__(self, employees=None, slots=SLOTS):
+        #None = every employee, GlobalState keeps them in the schedule (added ones included)
+        self._employees = employees
+        self._attached = employees is None
+        self.slots = slots
+        self.today = date.today()
+
+    @property
+    def employees(self):
+        if self._employees is None:
+            GlobalState.initialize()
+            self._employees = [e.internal_id for e in GlobalState.employees]
+
+        return self._employees
+
+    @property
+    def schedule(self):
+        if GlobalState.schedule is None:
+            GlobalState.initialize()
+
+        if GlobalState.schedule is None:
+            GlobalState.schedule = Schedule(self.employees, self.slots)
+
+        if not self._attached:
+            self._attached = True
+            for employee in self.employees:
+                GlobalState.schedule.add_employee(employee)
+
+        return GlobalState.schedule
+
+    #----------------------------------------------
+    #----------------SEARCH--------------------
+    #----------------------------------------------
+    #appointments matching a date, a date range ("start..end") or the best client/employee
+    #matches of the query (same ranked search as PersonStore.find)
+    def find(self, query, limit=10):
+        query = query.strip()
+
+        #only YYYY-MM-DD, fromisoformat also takes YYYYMMDD and that's what plenty of client ids look like
+        start, sep, end = query.partition("..")
+        try:
+            start = datetime.strptime(start.strip(), "%Y-%m-%d").date()
+            end = datetime.strptime(end.strip(), "%Y-%m-%d").date() if sep else start
+            return self.find_appointments(start=start, end=end)
+        except ValueError:
+            pass
+
+        GlobalState.initialize()
+        result = []
+        for client in GlobalState.search_indexes["clients"].find(query, limit):
+            result.extend(self.find_appointments(client=client))
+        for employee in GlobalState.search_indexes["employees"].find(query, limit):
+            result.extend(self.find_appointments(employee=employee))
+
+        return sorted(set(result))
+
+    #booked slots as (iso date, employee internal_id, slot, client id), sorted. Any mix of
+    #client, employee and date range. Client lookups go through the schedule's reverse index.
+    def find_appointments(self, client=None, employee=None, start=None, end=None):
+        since = start.isoformat() if start else ""
+        until = end.isoformat() if end else ""
+
+        if client is not None:
+            rows = (
+                (day, emp_id, slot, client.id)
+                for day, emp_id, slot in self.schedule.appointments(client.id, since=since)
+                if not until or day <= until
+            )
+        else:
+            rows = self.schedule.bookings(since, until)
+
+        emp_id = employee.internal_id if employee else None
+        return sorted(row for row in rows if emp_id is None or row[1] == emp_id)
+
+    #appointments as iso date -> ["slot → client | employee" lines], in the order given
+    def group_appointments(self, rows):
+        result = {}
+
+        for day, emp_id, slot, client_id in rows:
+            employee = GlobalState.lookup("employees", "internal_id", emp_id)
+            client = GlobalState.lookup("clients", "id", client_id)
+
+            emp_name = f"{employee.last_name}, {employee.name}" if employee else "UNKNOWN"
+            client_name = f"{client.last_name}, {client.name}" if client else "UNKNOWN"
+
+            result.setdefault(day, []).append(f"{slot} → {client_name} ({client_id}) | {emp_name} ({emp_id})")
+
+        return result
+
+    #first `count` openings of `length` free slots in a row, from start (default today) on,
+    #as (date, employee internal_id, [slots]). employee=None means anyone.
+    #each (day, employee) check is a few bit operations on the schedule's availability masks.
+    def find_openings(self, length=1, employee=None, start=None, count=5, horizon=90):
+        start = start or date.today()
+        end = start + timedelta(days=horizon)
+        employees = [employee.internal_id] if employee else list(self.schedule.employees)
+
+        now = datetime.now().strftime("%H:%M")
+        openings = []
+
+        for year in range(start.year, end.year + 1):
+            for row in get_calendar(year).between(start, end):
+                day = row["dt"]
+
+                for emp_id in employees:
+                    for i in self.schedule.free_runs(day, emp_id, length):
+                        #no booking in the past
+                        if day == date.today() and self.slots[i] <= now:
+                            continue
+
+                        openings.append((day, emp_id, self.slots[i:i + length]))
+                        break
+
+                    if len(openings) >= count:
+                        return openings
+
+        return openings
+
+    #{employee internal_id: [free slots]} of a day, for everyone or one employee
+    def availability(self, day, employee_id=None):
+        employees = [employee_id] if employee_id else self.schedule.employees
+        return {emp_id: self.schedule.free_slots(day, emp_id) for emp_id in employees}
+
+    def get_day(self, day: date):
+        return self.schedule.get_day(day)
+
+    #why nobody can book on day, or None if it's open
+    def closed_reason(self, day):
+        if day < date.today():
+            return "in the past"
+        if not is_working_day(day):
+            return "not a working day"
+        return None
+
+    #----------------------------------------------
+    #----------------BOOKING--------------------
+    #----------------------------------------------
+    #the same slots every `interval` days (a week by default), `count` times starting at start,
+    #as (date, employee internal_id, slot, client_id) bookings for book_many
+    @staticmethod
+    def recurrence(start, employee_id, slots, client_id, count=12, interval=7):
+        return [
+            (start + timedelta(days=interval * i), employee_id, slot, client_id)
+            for i in range(count)
+            for slot in slots
+        ]
+
+    #books every (date, employee internal_id, slot, client_id) or none of them.
+    #Returns the conflicts as [(booking, reason)]; with no conflicts everything is applied and
+    #journaled, then saved with a single write. The check and the writes happen under the lock,
+    #on the latest data of every terminal.
+    def book_many(self, bookings):
+        bookings = list(bookings)
+
+        with GlobalState.transaction():
+            sched = self.schedule
+
+            conflicts = sched.conflicts(bookings, closed=self.closed_reason)
+            if conflicts:
+                return conflicts
+
+            for day, emp_id, slot, client_id in bookings:
+                self.set_slot(day, emp_id, slot, client_id, expect=FREE)
+
+        return []
+
+    #frees every (date, employee internal_id, slot, client_id), as long as each slot is still booked
+    #by that client. All or nothing, like book_many.
+    def cancel_many(self, bookings):
+        bookings = list(bookings)
+
+        with GlobalState.transaction():
+            sched = self.schedule
+
+            conflicts = []
+            handled = set()     #(date, employee, slot) already in this batch
+            for booking in bookings:
+                day, emp_id, slot, client_id = booking
+                if slot not in sched.slots:
+                    conflicts.append((booking, f"unknown slot {slot}"))
+                elif (day, emp_id, slot) in handled:
+                    conflicts.append((booking, "listed twice"))
+                elif sched.get_slot(day, emp_id, slot) != client_id:
+                    conflicts.append((booking, "not booked by that client"))
+                else:
+                    handled.add((day, emp_id, slot))
+
+            if conflicts:
+                return conflicts
+
+            for day, emp_id, slot, client_id in bookings:
+                self.set_slot(day, emp_id, slot, FREE, expect=client_id)
+
+        return []
+
+    #writes value into [(employee internal_id, slot, what the slot held when the user saw it)]
+    #of a day. If another terminal changed any of them nothing is written and those slots are returned.
+    def replace_slots(self, target_day, changes, value):
+        with GlobalState.transaction():
+            sched = self.schedule
+
+            taken = [slot for emp_id, slot, seen in changes if sched.get_slot(target_day, emp_id, slot) != seen]
+            if taken:
+                return taken
+
+            for emp_id, slot, seen in changes:
+                self.set_slot(target_day, emp_id, slot, value, expect=seen)
+
+        return []
+
+    #every slot change goes through here so it ends up in the journal
+    def set_slot(self, target_day, emp_id, slot, value, expect=None):
+        self.schedule.set_slot(target_day, emp_id, slot, value, expect)
+        GlobalState.record("slot", date=target_day.isoformat(), employee=emp_id, slot=slot, value=value)
+        GlobalState.mark_dirty("schedule")
+
+    #----------------------------------------------
+    #----------------PEOPLE CHANGES--------------------
+    #----------------------------------------------
+    def apply_changes(self, before, after):
+        sched = self.schedule
+        today = self.today.isoformat()
+
+        person = before or after
+        is_employee = isinstance(person, Employee)
+
+        old_id = getattr(before, "internal_id" if is_employee else "id", None) if before else None
+        new_id = getattr(after, "internal_id" if is_employee else "id", None) if after else None
+
+        #deletions
+        if before and not after:
+
+            #on employee delete, remove all their schedules
+            if is_employee:
+                sched.drop_employee(old_id, today)
+                GlobalState.record("drop_employee", employee=old_id, since=today)
+                GlobalState.mark_dirty("schedule")
+                return
+
+            #on client delete, free all their upcoming slots
+            for day, emp, slot in sched.appointments(old_id, since=today):
+                self.set_slot(date.fromisoformat(day), emp, slot, FREE)
+            return
+
+        #new employee, bookable right away
+        if after and not before:
+            if is_employee:
+                sched.add_employee(new_id)
+            return
+
+        if not (old_id and new_id and old_id != new_id):
+            return
+
+        #on employee id change, move their schedules to the new id
+        if is_employee:
+            sched.rename_employee(old_id, new_id)
+            GlobalState.record("rename_employee", old=old_id, new=new_id)
+            GlobalState.mark_dirty("schedule")
+            return
+
+        #on client id change, move their schedules to the new id
+        for day, emp, slot in sched.appointments(old_id):
+            self.set_slot(date.fromisoformat(day), emp, slot, new_id)
@@ -1,16 +1,61 @@
-from datetime import datetime
+import argparse
+import sys
 
 #my libs
 from utils.rich_ui import RichUI as ui
-from utils.year_builder import ensure_year_file
 from utils.global_state import GlobalState
 from utils.app_builder import AppBuilder
+from controllers.cli_controller import CLIController
 
-def main():
-    ensure_year_file(datetime.now().year)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Final OOP Project - IFTS N°11")
+    parser.add_argument("--ui", choices=ui.PROFILES, help="UI profile (default: $POOIFTS_UI or 'real')")
+    parser.add_argument("--fast", action="store_true", help="shortcut for --ui fast")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="don't load the data in the background, wait until a menu needs it")
+    #the socket defaults to booking_server.SOCKET_PATH, "" stands for it (asyncio is only imported when used)
+    parser.add_argument("--serve", nargs="?", const="", metavar="SOCKET", help="run the booking server instead of the menu")
+    parser.add_argument("--connect", nargs="?", const="", metavar="SOCKET", help="thin terminal that books through a running server")
+    CLIController.add_commands(parser)
+    return parser.parse_args(argv)
 
-    # initialize all CSV + schedule memory
-    GlobalState.initialize()
+def main(argv=None):
+    args = parse_args(argv)
+    if args.fast:
+        ui.set_profile("fast")
+    elif args.ui:
+        ui.set_profile(args.ui)
+
+    #headless command (book, export, ...), no menu and nothing drawn
+    if args.command:
+        return CLIController(args).run()
+
+    if args.serve is not None:
+        from utils.booking_server import SOCKET_PATH, BookingServer
+
+        path = args.serve or SOCKET_PATH
+        print(f"Booking server listening on {path} (Ctrl+C to stop)")
+        BookingServer(path).run()
+        return
+
+    if args.connect is not None:
+        from utils.booking_server import SOCKET_PATH, BookingClient
+        from controllers.remote_controller import RemoteController
+
+        path = args.connect or SOCKET_PATH
+        try:
+            client = BookingClient(path)
+        except OSError:
+            ui.warning_message(f"No booking server on {path}, start one with: python main.py --serve")
+            return
+
+        RemoteController(client, ui).run_menu()
+        client.close()
+        return
+
+    #nothing is loaded before the menu shows up: the csv files, the schedule and the calendar load
+    #on first use, or in the background while the user is still looking at the menu
+    if args.warmup:
+        GlobalState.warm_up()
 
     controllers = AppBuilder().build()
 
@@ -28,12 +73,21 @@ def main():
 
         if choice == "Q":
             ui.show_loading_message(". . .")
+            #fold the journal back into the csv files before leaving
+            with ui.progress("Saving . . .") as update:
+                GlobalState.compact()
+                update(1, 1)
             break
 
         controller = controllers.get(choice)
         if controller:
+            #the first menu that needs the data waits for it here (or for the warm-up to finish it)
+            if not GlobalState.is_loaded():
+                with ui.progress("Loading data . . .") as update:
+                    GlobalState.initialize(progress=update)
+
             controller.run_menu(controller.crud_menu())
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,8 +1,28 @@
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field, fields
+import calendar
+from datetime import date, datetime, timedelta
 from abc import ABC, abstractmethod
+from typing import ClassVar
+
+#rebuilds a dataclass with __slots__: a fixed attribute layout instead of a __dict__ per object,
+#which adds up with a big client list. dataclass(slots=True) does the same but needs python 3.10.
+#every class of the hierarchy needs it, or the subclass gets its __dict__ back.
+def slotted(cls):
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    names = tuple(f.name for f in fields(cls) if f.name not in inherited)
+
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = names
+    for name in names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+#days the birthday gift (free haircut) lasts, the birthday included
+GIFT_DAYS = 14
 
 #omg, i didn't know dataclasses were a thing. They are so fucking goated to work with.
+@slotted
 @dataclass
 class IPerson(ABC):
     id: str
@@ -12,29 +32,94 @@ class IPerson(ABC):
     phone: str
 
     #this makes a dataclass field nnot required for a constructor.
-    age: int = field(init=False, repr=False)
-    is_bday_gift_active: bool = field(init=False, repr=False)
-    prefix: str = field(init=False, default="")
+    #same for every person of a class, so it lives on the class
+    prefix: ClassVar[str] = ""
     internal_id: str = field(init=False)
 
+    #caches behind age / is_bday_gift_active, not part of the record
+    _birth: tuple = field(init=False, repr=False, compare=False)    #(dob, date ordinal)
+    _derived: tuple = field(init=False, repr=False, compare=False)  #((dob, today ordinal), age, gift)
+
     def __post_init__(self):
-        self.age = self._get_age()
-        self.is_bday_gift_active = self._set_bday_gift()  
         self.internal_id = self.prefix + self.id
+        self._birth = None
+        self._derived = None
 
-    def _get_age(self):
-        birthdate = datetime.strptime(self.dob, "%Y-%m-%d")
-        today = datetime.today()
+    #age and the birthday gift are only worked out when someone asks for them (a card being shown),
+    #and again when the day or the dob changes, so loading people never parses a date
+    @property
+    def age(self):
+        return self._derived_fields()[1]
+
+    @property
+    def is_bday_gift_active(self):
+        return self._derived_fields()[2]
+
+    def _derived_fields(self):
+        today = date.today()
+        key = (self.dob, today.toordinal())
+        if self._derived is None or self._derived[0] != key:
+            birthdate = self.birthdate()
+            self._derived = (key, self._get_age(birthdate, today), self._set_bday_gift(birthdate, today))
+        return self._derived
+
+    #dob as a date, parsed once per dob value
+    def birthdate(self):
+        if self._birth is None or self._birth[0] != self.dob:
+            self._birth = (self.dob, datetime.strptime(self.dob, "%Y-%m-%d").toordinal())
+        return date.fromordinal(self._birth[1])
+
+    @staticmethod
+    def _get_age(birthdate, today):
         return today.year - birthdate.year -((today.month, today.day) < (birthdate.month, birthdate.day)) #stackoverflow
-    
-    def _set_bday_gift(self): 
-        today = datetime.today().date() 
-        birthdate = datetime.strptime(self.dob, "%Y-%m-%d").date() 
-        birthday_this_year = birthdate.replace(year=today.year) 
-        end_window = birthday_this_year.replace(year=today.year) + timedelta(days=13) 
 
-        return birthday_this_year <= today <= end_window
-    
+    #the gift lasts GIFT_DAYS from the birthday on, also across new year (a late december
+    #birthday still has its gift in early january)
+    @staticmethod
+    def _set_bday_gift(birthdate, today):
+        for year in (today.year, today.year - 1):
+            birthday = IPerson.birthday_in(birthdate, year)
+            end_window = birthday + timedelta(days=GIFT_DAYS - 1)
+            if birthday <= today <= end_window:
+                return True
+        return False
+
+    #same as is_bday_gift_active, for any day (e.g. the day of an appointment)
+    def gift_active_on(self, day):
+        return self._set_bday_gift(self.birthdate(), day)
+
+    #29th of february birthdays are on the 28th in other years
+    @staticmethod
+    def birthday_in(birthdate, year):
+        if birthdate.month == 2 and birthdate.day == 29 and not calendar.isleap(year):
+            return date(year, 2, 28)
+        return birthdate.replace(year=year)
+
+    #format rules of the user-entered fields. Returns the error message, or None if value is fine.
+    #Uniqueness depends on the rest of the data, the services check that.
+    @staticmethod
+    def check_field(field, value):
+        if field == "id":
+            if not value.isdigit() or len(value) != 8:
+                return "ID must be exactly 8 digits."
+
+        if field in ("name", "last_name"):
+            allowed = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-' ")
+            if not all(ch in allowed for ch in value):
+                return "Names may only contain letters, spaces, apostrophes ('), and hyphens (-)."
+
+        if field == "phone":
+            if not value.isdigit() or len(value) != 10:
+                return "Phone number must be a 10-digit number."
+
+        if field == "dob":
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                return "Date must be formatted YYYY-MM-DD."
+
+        return None
+
     def card_header(self):
         return (f"{self.name} {self.last_name}", f"{self.internal_id}") 
 
@@ -1,9 +1,11 @@
-from dataclasses import dataclass, field
-from repository.models.IPerson import IPerson
+from dataclasses import dataclass
+from typing import ClassVar
+from repository.models.IPerson import IPerson, slotted
 
+@slotted
 @dataclass
 class Client(IPerson):
-    prefix: str = field(init=False, default="01-")
+    prefix: ClassVar[str] = "01-"
 
     def card_color(self):
         return "bright_green"
\ No newline at end of file
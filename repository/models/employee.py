@@ -1,9 +1,11 @@
-from dataclasses import dataclass, field
-from repository.models.IPerson import IPerson
+from dataclasses import dataclass
+from typing import ClassVar
+from repository.models.IPerson import IPerson, slotted
 
+@slotted
 @dataclass
 class Employee(IPerson):
-    prefix: str = field(init=False, default="02-")
+    prefix: ClassVar[str] = "02-"
 
     def card_color(self):
         return "cyan"
\ No newline at end of file
@@ -1,34 +1,453 @@
-from dataclasses import dataclass, field
-from datetime import date, time, datetime, timedelta
-from typing import Dict, List
+from array import array
+from types import MappingProxyType
+from datetime import date
+from typing import Dict, List, NamedTuple
 
-@dataclass
+SLOTS = [
+    "09:00", "09:30", "10:00", "10:30", "11:00", "11:30",
+    "12:00", "12:30", "13:00", "13:30", "14:00", "14:30",
+    "15:00", "15:30", "16:00", "16:30"
+]
+
+FREE = "free"
+
+#set_slot with expect: the slot doesn't hold what the caller saw any more (another terminal booked it)
+class SlotConflict(Exception):
+    pass
+
+#one slot of a day as plain data, so callers don't have to parse display strings
+class DaySlot(NamedTuple):
+    employee: str
+    slot: str
+    client_id: str
+
+    @property
+    def is_free(self):
+        return self.client_id == FREE
+
+#compact schedule store. Employees, slots and clients are interned to integers and each day
+#is a flat array of (employees x slots) client indexes, 0 meaning free.
+#get_day / is_slot_free / set_slot still speak the old {employee: {slot: "free" | client_id}}
+#language, they're just a view on top of the arrays.
 class Schedule:
-    employees: List[str]
-    slots: List[str]
-    data: Dict[str, Dict[str, Dict[str, str]]] = field(default_factory=dict)
-    
-    def ensure_day(self, target_date: date):
-        d = target_date.isoformat()
+    TYPECODE = "I"
+
+    def __init__(self, employees: List[str], slots: List[str]):
+        self.slots = list(slots)
+        self._slot_index = {slot: i for i, slot in enumerate(self.slots)}
+
+        #interned columns never go away, so old bookings of a deleted employee stay readable
+        self._columns: List[str] = []
+        self._column_index: Dict[str, int] = {}
+        self.employees: List[str] = []
+
+        self.clients: List[str] = [FREE]
+        self._client_index: Dict[str, int] = {FREE: 0}
+
+        #only days with at least one booking are stored
+        self.days: Dict[str, array] = {}
+        self._free = None
 
-        if d not in self.data:
-            self.data[d] = {
-                employee: {slot: "free" for slot in self.slots}
-                for employee in self.employees
-            }
+        #availability bitmasks: iso date -> [taken slots of each column], bit i = self.slots[i]
+        self._busy: Dict[str, List[int]] = {}
+        self._all_slots = (1 << len(self.slots)) - 1
 
+        #reverse index: client index -> {(iso date, column, slot index)}, kept in sync by _set
+        self._by_client: Dict[int, set] = {}
+
+        #month partitions ("YYYY-MM"). With a source attached, months are loaded the first
+        #time one of their days is touched, and changed months are tracked for saving.
+        self._source = None
+        self._loaded_months = set()
+        self.dirty_months = set()
+
+        for employee in employees:
+            self.add_employee(employee)
+
+    #----------------------------------------------
+    #----------------INTERNING--------------------
+    #----------------------------------------------
+    def add_employee(self, employee: str):
+        self._column(employee)
+        if employee not in self.employees:
+            self.employees.append(employee)
+
+    def _column(self, employee: str):
+        col = self._column_index.get(employee)
+        if col is None:
+            col = len(self._columns)
+            self._columns.append(employee)
+            self._column_index[employee] = col
+        return col
+
+    def _client(self, client_id: str):
+        idx = self._client_index.get(client_id)
+        if idx is None:
+            idx = len(self.clients)
+            self.clients.append(client_id)
+            self._client_index[client_id] = idx
+        return idx
+
+    #----------------------------------------------
+    #----------------VIEW API--------------------
+    #----------------------------------------------
+    #allocates the storage for a day. Only writes need this, a missing day simply means all free.
+    def ensure_day(self, target_date: date):
+        return self._ensure_row(target_date.isoformat())
+
+    #read only: days without bookings get the shared free view and nothing is stored
     def get_day(self, target_date: date):
-        self.ensure_day(target_date)
-        return self.data[target_date.isoformat()]
+        row = self._row(target_date.isoformat())
+        if row is None:
+            return self._free_view()
+
+        return {
+            employee: {slot: self.clients[v] for slot, v in zip(self.slots, self._segment(row, col))}
+            for employee, col in self._day_columns(row)
+        }
+
+    #the day as DaySlot records, employee by employee in slot order. Same employees as get_day,
+    #or only the given one.
+    def day_view(self, target_date: date, employee: str = None):
+        row = self._row(target_date.isoformat())
+
+        if row is None:
+            columns = [(e, None) for e in self.employees if employee is None or e == employee]
+        else:
+            columns = [(e, col) for e, col in self._day_columns(row) if employee is None or e == employee]
+
+        result = []
+        for emp, col in columns:
+            values = self._segment(row, col) if col is not None else self._zeros(len(self.slots))
+            result.extend(DaySlot(emp, slot, self.clients[v]) for slot, v in zip(self.slots, values))
+        return result
 
     def get_employee_slots(self, target_date: date, employee: str):
         return self.get_day(target_date)[employee]
 
+    def get_slot(self, target_date: date, employee: str, slot: str):
+        row = self._row(target_date.isoformat())
+        col = self._column_index.get(employee)
+        if row is None or col is None:
+            return FREE
+
+        idx = col * len(self.slots) + self._slot_index[slot]
+        return self.clients[row[idx]] if idx < len(row) else FREE
+
     def is_slot_free(self, target_date: date, employee: str, slot: str):
-        return self.get_day(target_date)[employee][slot] == "free"
+        return self.get_slot(target_date, employee, slot) == FREE
+
+    #compare-and-set when expect is given: only writes if the slot still holds expect
+    def set_slot(self, target_date: date, employee: str, slot: str, value: str, expect: str = None):
+        if expect is not None:
+            current = self.get_slot(target_date, employee, slot)
+            if current != expect:
+                raise SlotConflict(f"{target_date} {slot} ({employee}) is {current}, expected {expect}")
+
+        self._set(target_date.isoformat(), employee, slot, value)
+
+    #slot names that are free for an employee on a day
+    def free_slots(self, target_date: date, employee: str):
+        segment = self.employee_row(target_date, employee)
+        return [slot for slot, v in zip(self.slots, segment) if not v]
+
+    #bit i set = self.slots[i] is free for that employee on that day
+    def free_mask(self, target_date: date, employee: str):
+        d = target_date.isoformat()
+        self._require(d)
+
+        busy = self._busy.get(d)
+        col = self._column_index.get(employee)
+        if busy is None or col is None or col >= len(busy):
+            return self._all_slots
+        return self._all_slots & ~busy[col]
+
+    #indexes of the slots where `length` free slots in a row start
+    def free_runs(self, target_date: date, employee: str, length: int = 1):
+        mask = self.free_mask(target_date, employee)
+
+        starts = mask
+        for i in range(1, length):
+            starts &= mask >> i
+
+        return [i for i in range(len(self.slots)) if starts >> i & 1]
+
+    #raw client indexes of an employee's day, 0 = free
+    def employee_row(self, target_date: date, employee: str):
+        row = self._row(target_date.isoformat())
+        col = self._column_index.get(employee)
+        if row is None or col is None:
+            return self._zeros(len(self.slots))
+        return self._segment(row, col)
+
+    #every booked slot as (iso date, employee, slot, client_id), optionally between since and until
+    def bookings(self, since: str = "", until: str = ""):
+        self._require_since(since, until)
+
+        n = len(self.slots)
+        for d, row in list(self.days.items()):
+            if d < since or (until and d > until) or not any(row):
+                continue
+            for idx, v in enumerate(row):
+                if v:
+                    col, s = divmod(idx, n)
+                    yield d, self._columns[col], self.slots[s], self.clients[v]
+
+    #every slot booked by a client as (iso date, employee, slot), sorted. Costs as much as
+    #the client's own bookings, not the whole history.
+    def appointments(self, client_id: str, since: str = ""):
+        self._require_since(since)
+
+        idx = self._client_index.get(client_id)
+        if not idx:
+            return []
+
+        return sorted(
+            (d, self._columns[col], self.slots[s])
+            for d, col, s in self._by_client.get(idx, ())
+            if d >= since
+        )
+
+    #----------------------------------------------
+    #----------------BULK BOOKING--------------------
+    #----------------------------------------------
+    #checks a batch of (date, employee, slot, client_id) bookings in one pass without changing
+    #anything. Returns [(booking, reason)], empty when every one of them can be booked.
+    #closed(date) can return a reason to refuse a whole day (weekends, the past...).
+    def conflicts(self, bookings, closed=None):
+        problems = []
+        active = set(self.employees)
+        taken = {}      #(iso date, employee) -> slots taken so far, disk + this batch
+        day_reason = {}
+
+        for booking in bookings:
+            day, employee, slot, client_id = booking
+            s = self._slot_index.get(slot)
+
+            if closed is not None and day not in day_reason:
+                day_reason[day] = closed(day)
+
+            if s is None:
+                problems.append((booking, f"unknown slot {slot}"))
+            elif employee not in active:
+                problems.append((booking, f"unknown employee {employee}"))
+            elif not client_id or client_id == FREE:
+                problems.append((booking, "no client"))
+            elif day_reason.get(day):
+                problems.append((booking, day_reason[day]))
+            else:
+                key = (day, employee)
+                mask = taken.get(key)
+                if mask is None:
+                    mask = taken[key] = self._all_slots & ~self.free_mask(day, employee)
+
+                if mask >> s & 1:
+                    problems.append((booking, "already taken"))
+                else:
+                    taken[key] = mask | 1 << s
+
+        return problems
+
+    #----------------------------------------------
+    #----------------EMPLOYEE CHANGES--------------------
+    #----------------------------------------------
+    #frees every slot of an employee starting at since (iso string) and retires them
+    def drop_employee(self, employee: str, since: str):
+        col = self._column_index.get(employee)
+        if col is None:
+            return
+
+        self._require_since(since)
+
+        n = len(self.slots)
+        blank = self._zeros(n)
+        for d, row in list(self.days.items()):
+            if d < since or col * n >= len(row) or not any(row[col * n:(col + 1) * n]):
+                continue
+
+            for s, v in enumerate(row[col * n:(col + 1) * n]):
+                if v:
+                    self._by_client[v].discard((d, col, s))
+
+            row[col * n:(col + 1) * n] = blank
+            self._busy[d][col] = 0
+            self.dirty_months.add(d[:7])
+            if not any(row):
+                del self.days[d]
+                del self._busy[d]
+
+        if employee in self.employees:
+            self.employees.remove(employee)
+
+    def rename_employee(self, old: str, new: str):
+        if old not in self._column_index:
+            return
+
+        #the partitions on disk spell out the employee id, every month they appear in changes.
+        #they're loaded while the old id still has its column, or they'd get a new one under it
+        self._require_since("")
+        col = self._column_index.pop(old)
+        n = len(self.slots)
+        for d, row in self.days.items():
+            if any(row[col * n:(col + 1) * n]):
+                self.dirty_months.add(d[:7])
+
+        self._columns[col] = new
+        self._column_index[new] = col
+        self.employees = [new if e == old else e for e in self.employees]
+
+    #----------------------------------------------
+    #----------------PERSISTENCE--------------------
+    #----------------------------------------------
+    #source needs months() -> ["YYYY-MM", ...] and rows(month) -> (iso date, employee, slot, client_id).
+    #only the given months are loaded now, the rest when they're first needed.
+    def attach(self, source, months=()):
+        self._source = source
+        for month in months:
+            self._require(month)
+
+    #booked slots of one month as (iso date, employee, slot, client_id), sorted
+    def month_bookings(self, month: str):
+        self._require(month)
+
+        n = len(self.slots)
+        result = []
+        for d, row in self.days.items():
+            if not d.startswith(month):
+                continue
+            for idx, v in enumerate(row):
+                if v:
+                    col, s = divmod(idx, n)
+                    result.append((d, self._columns[col], self.slots[s], self.clients[v]))
+        return sorted(result)
+
+    @classmethod
+    def from_dict(cls, data: dict, employees: List[str], slots: List[str]):
+        sched = cls(employees, slots)
+
+        for d, day in data.items():
+            for employee, day_slots in day.items():
+                sched._column(employee)
+                for slot, value in day_slots.items():
+                    if value != FREE and slot in sched._slot_index:
+                        sched._set(d, employee, slot, value, track=False)
+
+        return sched
+
+    #fills the schedule from (iso date, employee, slot, client_id) rows, e.g. straight from disk
+    def load_bookings(self, rows):
+        for d, employee, slot, client_id in rows:
+            if slot in self._slot_index:
+                self._set(d, employee, slot, client_id, track=False)
+
+    #only booked slots are written, anything missing is free
+    def to_dict(self):
+        result = {}
+        for d, emp, slot, client_id in self.bookings():
+            result.setdefault(d, {}).setdefault(emp, {})[slot] = client_id
+        return result
+
+    #----------------------------------------------
+    #----------------PRIVATE METHODS--------------------
+    #----------------------------------------------
+    def _zeros(self, count: int):
+        return array(self.TYPECODE, [0]) * count
+
+    def _ensure_row(self, d: str):
+        row = self.days.get(d)
+        if row is None:
+            row = self._zeros(len(self._columns) * len(self.slots))
+            self.days[d] = row
+        return row
+
+    #track=False is for rows coming from disk, they don't make their month dirty
+    def _set(self, d: str, employee: str, slot: str, value: str, track: bool = True):
+        if track:
+            self._require(d)
+
+        if value == FREE and d not in self.days:
+            return
+
+        row = self._ensure_row(d)
+        n = len(self.slots)
+        col = self._column(employee)
+        s = self._slot_index[slot]
+        idx = col * n + s
+
+        #employees registered after the day was created don't have a column yet
+        if idx >= len(row):
+            row.extend(self._zeros((idx // n + 1) * n - len(row)))
+
+        old = row[idx]
+        new = self._client(value)
+        if old == new:
+            return
+
+        if old:
+            self._by_client[old].discard((d, col, s))
+        if new:
+            self._by_client.setdefault(new, set()).add((d, col, s))
+
+        row[idx] = new
+
+        busy = self._busy.setdefault(d, [])
+        if col >= len(busy):
+            busy.extend([0] * (col + 1 - len(busy)))
+        if new:
+            busy[col] |= 1 << s
+        else:
+            busy[col] &= ~(1 << s)
+
+        if track:
+            self.dirty_months.add(d[:7])
+
+        if not new and not any(row):
+            del self.days[d]
+            del self._busy[d]
+
+    def _row(self, d: str):
+        self._require(d)
+        return self.days.get(d)
+
+    #makes sure the month of d (an iso date or "YYYY-MM") is in memory
+    def _require(self, d: str):
+        month = d[:7]
+        if self._source is None or month in self._loaded_months:
+            return
+
+        self._loaded_months.add(month)
+        self.load_bookings(self._source.rows(month))
+
+    def _require_since(self, since: str, until: str = ""):
+        if self._source is None:
+            return
+
+        for month in self._source.months():
+            if month >= since[:7] and (not until or month <= until[:7]):
+                self._require(month)
+
+    def _segment(self, row, col):
+        n = len(self.slots)
+        segment = row[col * n:(col + 1) * n]
+        if len(segment) < n:
+            segment.extend(self._zeros(n - len(segment)))
+        return segment
+
+    #a read only all-free day for the current employees, rebuilt only when they change
+    def _free_view(self):
+        key = tuple(self.employees)
+        if self._free is None or self._free[0] != key:
+            free_slots = MappingProxyType({slot: FREE for slot in self.slots})
+            self._free = (key, MappingProxyType({employee: free_slots for employee in key}))
+        return self._free[1]
 
-    def set_slot(self, target_date: date, employee: str, slot: str, value: str):
-        self.get_day(target_date)[employee][slot] = value
+    #active employees plus anyone retired who still has bookings on that day
+    def _day_columns(self, row):
+        n = len(self.slots)
+        active = set(self.employees)
+        for col, employee in enumerate(self._columns):
+            if employee in active or any(row[col * n:(col + 1) * n]):
+                yield employee, col
 
     def __contains__(self, target_date: date):
-        return target_date.isoformat() in self.data
\ No newline at end of file
+        return self._row(target_date.isoformat()) is not None
@@ -1,17 +1,16 @@
-from abc import ABC, abstractmethod
+from abc import ABC
 from utils.rich_ui import RichUI as ui
-from utils.global_state import GlobalState
-from dataclasses import fields
 
+#menus and prompts on top of a PersonStore (engine/), which does the actual work
 class BaseService(ABC):
 
-    def __init__(self, state_key, model_class):
-        GlobalState.initialize()
+    def __init__(self, store):
+        self.store = store
+        self.model_class = store.model_class
 
-        self.state_key = state_key
-        self.model_class = model_class
-
-        self.items = getattr(GlobalState, state_key)
+    @property
+    def items(self):
+        return self.store.items
 
     def create(self):
         try:
@@ -25,7 +24,7 @@ class BaseService(ABC):
                         ui.warning_message("Creation cancelled.")
                         return None
 
-                    error = self._validate_field(key, value)
+                    error = self.store.validate_field(key, value)
                     if error:
                         ui.warning_message(error)
                         ui.pause()
@@ -35,7 +34,6 @@ class BaseService(ABC):
                     break
 
             obj = self.model_class(**data)
-            self.items.append(obj)
 
             confirmed = ui.confirm_action(
                 f"Register new {self.model_class.__name__}?",
@@ -47,8 +45,12 @@ class BaseService(ABC):
                 return None
 
             try:
-                self._save()
-                self._propagate_changes(None, obj)
+                error = self.store.add(obj)
+                if error:
+                    ui.warning_message(error)
+                    ui.pause()
+                    return None
+
                 ui.show_message("Changes saved successfully!.")
             except Exception as e:
                 ui.throw_exception("Error saving", e)
@@ -69,19 +71,14 @@ class BaseService(ABC):
             self._no_items_found()
             return
 
-        target = ui.live_search(self.items, f"Select {self.model_class.__name__} to update")
+        target = ui.live_search(self.items, f"Select {self.model_class.__name__} to update", self.store.search_index)
 
         if not target:
             ui.warning_message("Operation cancelled.")
             ui.pause()
             return
 
-        before_data = {
-            f.name: getattr(target, f.name)
-            for f in fields(self.model_class)
-            if f.init
-        }
-        before = self.model_class(**before_data)
+        version = self.store.version_of(target)
 
         updates = ui.edit_object(target, self.field_map)
 
@@ -89,20 +86,13 @@ class BaseService(ABC):
             ui.warning_message("Operation cancelled.")
             return
 
-        for field, value in updates.items():
-            setattr(target, field, value)
-
-        if hasattr(target, "internal_id"):
-            target.internal_id = f"{target.prefix}{target.id}"
-
-        for idx, item in enumerate(self.items):
-            if item is target:
-                self.items[idx] = target
-                break
-                
         try:
-            self._propagate_changes(before, target)
-            self._save()
+            error = self.store.update(target, updates, version)
+            if error:
+                ui.warning_message(error)
+                ui.pause()
+                return
+
             ui.show_message("Changes saved successfully!.")
         except Exception as e:
                 ui.throw_exception("Error saving", e)
@@ -113,6 +103,7 @@ class BaseService(ABC):
             return
 
         identifier = getattr(target, "internal_id", None) or getattr(target, "id", None)
+        version = self.store.version_of(target)
 
         if not ui.confirm_action(
             f"Delete {self.model_class.__name__}?",
@@ -124,9 +115,12 @@ class BaseService(ABC):
         #44885577,test,test,1997-07-06,1155442200
         #64011833,Veronica,Salas,1997-03-28,1165904410
         try:
-            self.items.remove(target)
-            self._propagate_changes(target, None)
-            self._save()
+            error = self.store.remove(target, version)
+            if error:
+                ui.warning_message(error)
+                ui.pause()
+                return
+
             ui.show_message("Changes saved successfully!.")
         except ValueError:
             ui.throw_exception("Delete failed", f"{target}")
@@ -140,42 +134,10 @@ class BaseService(ABC):
 
         ui.show_cards_static([result])
         ui.pause()
-   
-    def _validate_field(self, field, value):
-        if field == "id":
-            if not value.isdigit() or len(value) != 8:
-                return "ID must be exactly 8 digits."
-            
-            # uniqueness check
-            if any(str(item.id) == value for item in self.items):
-                return "Someone with this ID already exists."
-
-        if field in ("name", "last_name"):
-            allowed = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-' ")
-            if not all(ch in allowed for ch in value):
-                return "Names may only contain letters, spaces, apostrophes ('), and hyphens (-)."
-
-        if field == "phone":
-            if not value.isdigit() or len(value) != 10:
-                return "Phone number must be a 10-digit number."
-
-            if any(str(item.phone) == value for item in self.items):
-                return "This phone number is already registered."
-
-        if field == "dob":
-            from datetime import datetime
-            try:
-                datetime.strptime(value, "%Y-%m-%d")
-            except ValueError:
-                return "Date must be formatted YYYY-MM-DD."
-
-        return None
-    
-    def _propagate_changes(self, before, after):
-        schedule_service = getattr(GlobalState, "schedule_service", None)
-        if not schedule_service:
-            return
-        schedule_service.apply_changes(before=before, after=after)
+
+    #ranked matches for query, see PersonStore.find
+    def find(self, query, limit=10):
+        return self.store.find(query, limit)
 
     def _live_search(self):
         if not self.items:
@@ -183,7 +145,7 @@ class BaseService(ABC):
             ui.pause()
             return None
 
-        result = ui.live_search(self.items, f"Search {self.model_class.__name__}")
+        result = ui.live_search(self.items, f"Search {self.model_class.__name__}", self.store.search_index)
 
         if not result:
             ui.warning_message("No match found or cancelled.")
@@ -192,11 +154,7 @@ class BaseService(ABC):
 
         return result
 
-    def _save(self):
-        GlobalState.save()
-        self.items = getattr(GlobalState, self.state_key)
-    
     def _no_items_found(self):
         ui.warning_message(f"No {self.model_class.__name__.lower()}s found.")
         ui.pause()
-        return
\ No newline at end of file
+        return
@@ -1,7 +1,7 @@
+from datetime import date
 from .base_service import BaseService
-from repository.models.client import Client
+from engine.client_store import ClientStore
 from utils.rich_ui import RichUI as ui
-from utils.global_state import GlobalState
 
 class ClientService(BaseService):
 
@@ -14,4 +14,21 @@ class ClientService(BaseService):
     ]
 
     def __init__(self):
-        super().__init__("clients", Client)
+        super().__init__(ClientStore())
+
+    @property
+    def extra_actions(self):
+        return [("6", "Birthday report", self.birthday_report)]
+
+    def birthday_report(self):
+        today = date.today()
+
+        def lines(people):
+            return [f"{p.last_name}, {p.name} ({p.id}) | {p.dob} | {p.phone}" for p in people] or ["Nobody."]
+
+        ui.paginate_sectioned({
+            f"Birthday gift active today ({today})": lambda: lines(self.store.active_gifts(today)),
+            "Birthdays in the next 7 days": lambda: [
+                f"{day:%a %Y-%m-%d} → {p.last_name}, {p.name} ({p.id})" for day, p in self.store.upcoming_birthdays(7, today)
+            ] or ["Nobody."],
+        })
\ No newline at end of file
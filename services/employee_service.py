@@ -1,7 +1,5 @@
 from .base_service import BaseService
-from repository.models.employee import Employee
-from utils.rich_ui import RichUI as ui
-from utils.global_state import GlobalState
+from engine.employee_store import EmployeeStore
 
 class EmployeeService(BaseService):
 
@@ -14,4 +12,4 @@ class EmployeeService(BaseService):
     ]
 
     def __init__(self):
-        super().__init__("employees", Employee)
+        super().__init__(EmployeeStore())
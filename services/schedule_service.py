@@ -1,32 +1,32 @@
 from datetime import date
-from repository.models.schedule import Schedule
+from itertools import groupby
+from repository.models.schedule import FREE
 from utils.rich_ui import RichUI as ui
 from utils.year_builder import read_filtered
 from utils.global_state import GlobalState
+from engine.client_store import ClientStore
+from engine.employee_store import EmployeeStore
 
-
+#menus and prompts on top of the ScheduleEngine (engine/), which does the actual work
 class ScheduleService:
-    def __init__(self, employees, slots):
-        self.employees = employees
-        self.slots = slots
+    def __init__(self, engine):
+        self.engine = engine
+        self.clients = ClientStore()
+        self.employees = EmployeeStore()
+        self.slots = engine.slots
         self.today = date.today()
 
     @property
     def schedule(self):
-        if GlobalState.schedule is None:
-            GlobalState.schedule = {}
-
-        sched = Schedule(self.employees, self.slots)
-        sched.data = GlobalState.schedule
-        return sched
+        return self.engine.schedule
 
     def create(self):
-        if not GlobalState.clients:
+        if not self.clients.items:
             ui.warning_message("No clients found. Register one first.")
             ui.pause()
             return
 
-        client = ui.live_search(GlobalState.clients, "Find Client")
+        client = ui.live_search(self.clients.items, "Find Client", self.clients.search_index)
         if not client:
             return
 
@@ -34,23 +34,27 @@ class ScheduleService:
         if not target_day:
             return
 
-        employee = ui.pick_employee(GlobalState.employees)
+        employee = ui.pick_employee(self.employees.items)
         if not employee:
             return
 
-        slots = self._select_slots(target_day, mode="create")[0]
-        if not slots:
+        flat, indices = self._select_slots(target_day, mode="create", employee=employee.internal_id)
+        if not flat:
             ui.warning_message("No free slots for this employee.")
             ui.pause()
             return
 
-        flat = [(employee.internal_id, s, None) for s in slots]
-        indices = range(len(flat))
-        self._apply_changes(target_day, flat, indices, client.id)
+        if not self._apply_changes(target_day, flat, indices, client.id):
+            return
 
-        ui.show_message(f"Saved {len(slots)} appointment(s).")
+        ui.show_message(f"Saved {len(flat)} appointment(s).{self._gift_note(client, [target_day])}")
 
     def read(self):
+        if self.today not in self.schedule:
+            ui.show_message(f"No booked appointments for {self.today}")
+            ui.pause()
+            return
+
         groups = self._day_to_dict(self.today)
 
         if not groups:
@@ -67,11 +71,12 @@ class ScheduleService:
 
         flat, _ = data
 
-        new_client = ui.live_search(GlobalState.clients, "Assign client")
+        new_client = ui.live_search(self.clients.items, "Assign client", self.clients.search_index)
         if not new_client:
             return
 
-        self._apply_changes(target_day, flat, range(len(flat)), new_client.id)
+        if not self._apply_changes(target_day, flat, range(len(flat)), new_client.id):
+            return
         ui.show_message(f"Updated {len(flat)} appointment(s).")
 
     def delete(self):
@@ -84,129 +89,185 @@ class ScheduleService:
         if not ui.confirm_action(f"Delete {len(flat)} appointment(s)?", ""):
             return
 
-        self._apply_changes(target_day, flat, range(len(flat)), "free")
+        if not self._apply_changes(target_day, flat, range(len(flat)), FREE):
+            return
         ui.show_message(f"Deleted {len(flat)} appointment(s).")
 
     def search(self):
-        pass
+        query = ui.prompt_user("Client, employee, date (YYYY-MM-DD) or range (YYYY-MM-DD..YYYY-MM-DD)")
 
-    def get_day(self, day: date):
-        return self.schedule.get_day(day)
-
-    def apply_changes(self, before, after):
-        schedule = GlobalState.schedule
+        groups = self.engine.group_appointments(self.engine.find(query))
+        if not groups:
+            ui.show_message(f"No appointments found for '{query}'")
+            ui.pause()
+            return
 
-        old_client_id = getattr(before, "id", None) if before else None
-        new_client_id = getattr(after, "id", None) if after else None
+        ui.paginate_sectioned(groups)
 
-        old_employee_id = getattr(before, "internal_id", None) if before else None
-        new_employee_id = getattr(after, "internal_id", None) if after else None
+    #menu entries on top of the CRUD ones, picked up by CRUDController
+    @property
+    def extra_actions(self):
+        return [
+            ("6", "Next available appointment", self.next_available),
+            ("7", "Weekly appointment", self.create_weekly),
+        ]
+
+    def next_available(self):
+        length = ui.prompt_user(f"How many consecutive slots? (1-{len(self.slots)})")
+        if not length.isdigit() or not 1 <= int(length) <= len(self.slots):
+            ui.warning_message("Invalid number of slots.")
+            ui.pause()
+            return
 
-        #deletions
-        if before and not after:
-            
-            #on employee delete, remove all their schedules
-            if old_employee_id:
-                for day in list(schedule.keys()):
-                    if day < self.today:
-                        continue
-                    schedule[day].pop(old_employee_id, None)
+        employee = None
+        if not ui.confirm_action("Any employee?", "N = pick one"):
+            employee = ui.pick_employee(self.employees.items)
+            if not employee:
                 return
 
-            #on employee delete, remove all their schedules from the employees
-            if old_client_id:
-                for day, employees in schedule.items():
-                    if day < self.today:
-                        continue
-                    for emp, slots in employees.items():
-                        for slot, value in slots.items():
-                            if value == old_client_id:
-                                slots[slot] = "free"
-                return
-        
-        #on employee id change, move their schedules to the new id
-        if old_employee_id and new_employee_id and old_employee_id != new_employee_id:
-            for day, employees in schedule.items():
-                if old_employee_id in employees:
-                    employees[new_employee_id] = employees.pop(old_employee_id)
-
-        #on client id change, move their schedules to the new id
-        if old_client_id and new_client_id and old_client_id != new_client_id:
-            for day, employees in schedule.items():
-                for emp, slots in employees.items():
-                    for slot, value in slots.items():
-                        if value == old_client_id:
-                            slots[slot] = new_client_id
+        openings = self.engine.find_openings(int(length), employee)
+        if not openings:
+            ui.warning_message("No openings found.")
+            ui.pause()
+            return
+
+        options = {}
+        for i, (day, emp_id, slots) in enumerate(openings, start=1):
+            emp = GlobalState.lookup("employees", "internal_id", emp_id)
+            name = f"{emp.last_name}, {emp.name}" if emp else emp_id
+            options[str(i)] = (day, emp_id, slots, f"{day:%a %Y-%m-%d} {slots[0]}-{slots[-1]} | {name}")
+
+        choice = ui.simple_menu(
+            "Next available",
+            f"{length} slot(s) in a row",
+            [(key, option[3]) for key, option in options.items()] + [("Q", "Cancel")]
+        )
+        if choice not in options:
+            return
+
+        day, emp_id, slots, _ = options[choice]
+
+        client = ui.live_search(self.clients.items, "Find Client", self.clients.search_index)
+        if not client:
+            return
+
+        flat = [(emp_id, slot, None) for slot in slots]
+        if not self._apply_changes(day, flat, range(len(flat)), client.id):
+            return
+        ui.show_message(f"Saved {len(slots)} appointment(s).{self._gift_note(client, [day])}")
+
+    #----------------------------------------------
+    #----------------BULK BOOKING--------------------
+    #----------------------------------------------
+    def create_weekly(self):
+        client = ui.live_search(self.clients.items, "Find Client", self.clients.search_index)
+        if not client:
+            return
+
+        target_day = self._pick_day()
+        if not target_day:
+            return
+
+        employee = ui.pick_employee(self.employees.items)
+        if not employee:
+            return
+
+        flat, _ = self._select_slots(target_day, mode="create", employee=employee.internal_id)
+        if not flat:
+            ui.warning_message("No free slots for this employee.")
+            ui.pause()
+            return
+
+        weeks = ui.prompt_user("For how many weeks?")
+        if not weeks.isdigit() or int(weeks) < 1:
+            ui.warning_message("Invalid number of weeks.")
+            ui.pause()
+            return
 
+        slots = [slot for _, slot, _ in flat]
+        bookings = self.engine.recurrence(target_day, employee.internal_id, slots, client.id, int(weeks))
+
+        conflicts = self.engine.book_many(bookings)
+        if conflicts:
+            lines = [f"{day} {slot} → {reason}" for (day, _, slot, _), reason in conflicts]
+            ui.paginate_sectioned({f"Nothing was booked, {len(conflicts)} conflict(s)": lines})
+            return
+
+        ui.show_message(f"Saved {len(bookings)} appointment(s).{self._gift_note(client, [b[0] for b in bookings])}")
+
+    #free haircut reminder for the appointments that fall in the client's birthday gift window
+    @staticmethod
+    def _gift_note(client, days):
+        gift_days = sorted({day for day in days if client.gift_active_on(day)})
+        if not gift_days:
+            return ""
+        return f"\n[bold]Birthday gift[/bold] on {', '.join(map(str, gift_days))}: free haircut!"
+
+    #employee header -> lines for paginate_sectioned. The lines of each employee are only
+    #formatted when their page is shown.
     def _day_to_dict(self, target_day):
-        day = GlobalState.schedule.get(target_day.isoformat(), {})
         result = {}
 
-        for emp_id, slots in day.items():
-            employee = next((e for e in GlobalState.employees if e.internal_id == emp_id), None)
+        for emp_id, entries in groupby(self.schedule.day_view(target_day), key=lambda e: e.employee):
+            employee = GlobalState.lookup("employees", "internal_id", emp_id)
             if not employee:
                 continue
 
-            entry_list = []
-            for time_slot, client_id in slots.items():
-
-                if client_id == "free":
-                    entry_list.append(f"{time_slot} → (free)")
-                else:
-                    client = next((c for c in GlobalState.clients if c.id == client_id), None)
-                    name = f"{client.last_name}, {client.name}" if client else "UNKNOWN"
-                    entry_list.append(f"{time_slot} → {name} ({client_id})")
-
             header = f"{employee.last_name}, {employee.name} ({emp_id})"
-            result[header] = entry_list
+            result[header] = lambda entries=list(entries): [self._format_slot(e) for e in entries]
 
         return result
 
+    @staticmethod
+    def _format_slot(entry):
+        if entry.is_free:
+            return f"{entry.slot} → (free)"
+
+        client = GlobalState.lookup("clients", "id", entry.client_id)
+        name = f"{client.last_name}, {client.name}" if client else "UNKNOWN"
+        return f"{entry.slot} → {name} ({entry.client_id})"
+
     def _pick_day(self):
         rows = read_filtered(date.today().year)
         if not rows:
             return None
 
         ui._show_calendar(rows)
-        valid = {str(i+1): r["date"] for i, r in enumerate(rows)}
+        valid = {str(i+1): r["dt"] for i, r in enumerate(rows)}
         choice = ui._option_select(list(valid.keys()), "1")
 
-        return date.fromisoformat(valid[choice])
+        return valid[choice]
 
     def _pick_client(self):
-        return ui.live_search(GlobalState.clients, "Select new client")
+        return ui.live_search(self.clients.items, "Select new client", self.clients.search_index)
 
-    def _select_slots(self, target_day, mode="update"):
-        groups = self._day_to_dict(target_day)
-        if not groups:
+    #returns ([(emp_id, slot, DaySlot)], indices). On create only free slots can be picked
+    #and, with an employee, only that employee's slots are shown.
+    def _select_slots(self, target_day, mode="update", employee=None):
+        entries = self.schedule.day_view(target_day, employee)
+        if not entries:
             return None, None
 
-        merged = {}
-        for header, items in groups.items():
-            emp_id = header.split("(")[-1].strip(")")
-            for line in items:
-                slot = line.split("→")[0].strip()
-                merged[f"{emp_id}|{slot}"] = line
-
+        by_key = {}
         slot_state = {}
 
-        for key, line in merged.items():
-            is_free = "(free)" in line
+        for entry in entries:
+            key = entry.slot if employee else f"{entry.employee}|{entry.slot}"
+            by_key[key] = entry
 
             if mode == "create":
-                slot_state[key] = "free" if is_free else "taken"
+                slot_state[key] = "free" if entry.is_free else "taken"
             else:
                 slot_state[key] = "free"
 
+        if mode == "create" and "free" not in slot_state.values():
+            return None, None
+
         selected_keys = ui.pick_slots(slot_state)
         if not selected_keys:
             return None, None
 
-        flat = []
-        for key in selected_keys:
-            emp_id, slot = key.split("|")
-            flat.append((emp_id, slot, merged[key]))
-
+        flat = [(by_key[key].employee, by_key[key].slot, by_key[key]) for key in selected_keys]
         return flat, list(range(len(flat)))
 
     def _get_day_and_slots(self, mode="update"):
@@ -220,20 +281,27 @@ class ScheduleService:
 
         return target_day, (flat, selected), None
 
+    #writes value into the picked slots, as long as they still hold what the user was shown
+    #(the DaySlot in flat, or free). If another terminal changed any of them nothing is written.
     def _apply_changes(self, target_day, flat, indices, value):
-        sched = self.schedule
+        changes = []
         for i in indices:
-            emp_id, slot, _ = flat[i]
-            sched.set_slot(target_day, emp_id, slot, value)
+            emp_id, slot, entry = flat[i]
+            changes.append((emp_id, slot, entry.client_id if entry else FREE))
+
+        taken = self.engine.replace_slots(target_day, changes, value)
+        if taken:
+            ui.warning_message(f"{', '.join(taken)} changed from another terminal. Nothing was saved, try again.")
+            ui.pause()
+            return False
 
-        GlobalState.schedule = sched.data
-        GlobalState.save()
+        return True
 
     def _pick_free_slots(self, target_day, employee_id):
         day = self.schedule.get_day(target_day)
         slots = day.get(employee_id, {})
 
-        free = [slot for slot, val in slots.items() if val == "free"]
+        free = self.schedule.free_slots(target_day, employee_id)
         if not free:
             return None
 
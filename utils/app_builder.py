@@ -1,5 +1,4 @@
 from utils.rich_ui import RichUI as ui
-from utils.global_state import GlobalState
 
 from datetime import datetime
 
@@ -7,8 +6,9 @@ from utils.year_builder import ensure_year_file
 from services.client_service import ClientService
 from services.employee_service import EmployeeService
 from services.schedule_service import ScheduleService
+from engine.schedule_engine import ScheduleEngine
 
-from controllers.CRUD_controller import CRUDController
+from controllers.crud_controller import CRUDController
 
 
 class AppBuilder:
@@ -19,19 +19,7 @@ class AppBuilder:
         client_service = ClientService()
         employee_service = EmployeeService()
 
-        
-        SLOTS = [
-            "09:00", "09:30", "10:00", "10:30", "11:00", "11:30",
-            "12:00", "12:30", "13:00", "13:30", "14:00", "14:30",
-            "15:00", "15:30", "16:00", "16:30"
-        ]
-
-        schedule_service = ScheduleService(
-            employees=[e.internal_id for e in employee_service.items],
-            slots=SLOTS
-        )
-
-        GlobalState.schedule_service = schedule_service
+        schedule_service = ScheduleService(ScheduleEngine())
 
         self._controllers = {
             "1": CRUDController("Clients", client_service, ui),
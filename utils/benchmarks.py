@@ -0,0 +1,581 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from repository.models.client import Client
+from repository.models.employee import Employee
+from repository.models.schedule import SLOTS
+from utils.birthday_index import BirthdayIndex
+from utils.client_import import import_clients
+from utils.data_gateway import DataGateway
+from utils.global_state import GlobalState
+from utils.journal import Journal
+from utils.search_index import SearchIndex
+
+#synthetic data + timings for the hot paths. Nothing here touches ./repository/data.
+#run with: python -m utils.benchmarks <name> [size]
+
+SYLLABLES = ["ma", "ri", "lu", "ca", "to", "go", "mez", "ra", "na", "sa", "li", "va", "len", "ti", "ro", "man", "pe", "rez", "di", "az"]
+
+def fake_people(count, seed=0):
+    rng = random.Random(seed)
+
+    def word(parts):
+        return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+    #a few hundred first names and a few thousand last names, like a real client list
+    first_names = [word(2) for _ in range(300)]
+    last_names = [word(3) for _ in range(3000)]
+
+    return [
+        SimpleNamespace(
+            id=str(10_000_000 + i),
+            name=rng.choice(first_names),
+            last_name=rng.choice(last_names),
+            phone=str(1_100_000_000 + rng.randrange(100_000_000)),
+        )
+        for i in range(count)
+    ]
+
+def _timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def bench_find(size=100_000, repeat=200):
+    people = fake_people(size)
+    index = SearchIndex(people)
+
+    start = time.perf_counter()
+    index.find("warmup")
+    print(f"index build ({size} people): {time.perf_counter() - start:.2f} s")
+
+    sample = people[size // 2]
+    typo = sample.last_name[:-1] + "x"
+    queries = {
+        "exact id": sample.id,
+        "phone prefix": sample.phone[:6],
+        "last name": sample.last_name,
+        "name prefix": sample.name[:3],
+        "full name": f"{sample.name} {sample.last_name}",
+        "typo": f"{sample.name} {typo}",
+    }
+
+    for label, query in queries.items():
+        elapsed = _timed(lambda: index.find(query, 10), repeat)
+        print(f"find {label:<13} {query!r:<28} {elapsed * 1000:.3f} ms")
+
+#runs the body inside an empty temp folder, so whatever writes to ./repository/data
+#(journal, calendar files) writes there
+@contextmanager
+def _scratch():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("repository/data")
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+def bench_book_many(size=10_000, employees=20):
+    from engine.schedule_engine import ScheduleEngine
+
+    emp_ids = [f"02-{10_000_000 + i}" for i in range(employees)]
+    clients = fake_people(-(-size // 12))
+
+    with _scratch():
+        GlobalState.journal = Journal("./repository/data/journal.log", limit=float("inf"))
+        GlobalState.initialize()
+        engine = ScheduleEngine(emp_ids, SLOTS)
+
+        #weekly standing appointments from next monday on, one client per slot and employee
+        start = date.today() + timedelta(days=7 - date.today().weekday())
+        bookings = []
+        for i, client in enumerate(clients):
+            emp_id = emp_ids[i % employees]
+            slot = SLOTS[i // employees % len(SLOTS)]
+            day = start + timedelta(days=i // (employees * len(SLOTS)) % 5)
+            bookings.extend(engine.recurrence(day, emp_id, [slot], client.id, count=12))
+        bookings = bookings[:size]
+
+        #the calendar files get read once, keep that out of the numbers
+        engine.closed_reason(start)
+
+        elapsed = time.perf_counter()
+        conflicts = engine.schedule.conflicts(bookings, closed=engine.closed_reason)
+        check = time.perf_counter() - elapsed
+        print(f"validate {len(bookings)} bookings: {check * 1000:.1f} ms ({len(conflicts)} conflicts)")
+
+        #one double booking at the end, nothing may be applied
+        elapsed = time.perf_counter()
+        conflicts = engine.book_many(bookings + bookings[:1])
+        print(f"rejected batch ({len(conflicts)} conflict): {(time.perf_counter() - elapsed) * 1000:.1f} ms, "
+              f"{len(GlobalState.schedule.days)} days touched")
+
+        elapsed = time.perf_counter()
+        conflicts = engine.book_many(bookings)
+        total = time.perf_counter() - elapsed
+        print(f"book_many {len(bookings)} bookings: {total * 1000:.1f} ms, "
+              f"{len(bookings) / total:,.0f} bookings/s, journal {GlobalState.journal.size() / 1024:.0f} KB")
+
+#merges size synthetic clients (1% of them broken or duplicated) into an empty clients.csv
+def bench_import(size=20_000):
+    import csv
+
+    with _scratch():
+        with open("new_clients.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "name", "last_name", "dob", "phone"])
+            for i, person in enumerate(fake_people(size)):
+                dob = "1990-13-01" if i % 200 == 1 else "1990-01-01"
+                phone = "1100000000" if i % 200 == 2 else person.phone
+                writer.writerow([person.id, person.name, person.last_name, dob, phone])
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        added, rejected, _ = import_clients("new_clients.csv")
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"import {size} rows: {elapsed:.2f} s, {size / elapsed:,.0f} rows/s, "
+              f"{added} added, {rejected} rejected, peak {peak / 1024 / 1024:.1f} MB")
+
+#memory held by size hydrated clients (objects + their field strings), per client
+def bench_memory(size=100_000):
+    rows = [
+        (str(10_000_000 + i), f"Name{i % 300}", f"Last{i % 3000}", f"19{50 + i % 50}-0{1 + i % 9}-1{i % 10}", str(1_100_000_000 + i))
+        for i in range(size)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    clients = [Client(*row) for row in rows]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{size} clients: {used / 1024 / 1024:.1f} MB, {used / len(clients):.0f} bytes per client")
+
+#reads and hydrates a clients.csv of size rows, then renders the derived fields of one page of cards
+def bench_load(size=100_000):
+    with _scratch():
+        gateway = DataGateway()
+        gateway.save("clients.csv", (
+            Client(p.id, p.name, p.last_name, f"19{50 + i % 50}-0{1 + i % 9}-1{i % 10}", p.phone)
+            for i, p in enumerate(fake_people(size))
+        ))
+
+        start = time.perf_counter()
+        clients = list(gateway.stream("clients.csv", Client))
+        print(f"load {len(clients)} clients: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        elapsed = _timed(lambda: [(c.age, c.is_bday_gift_active) for c in clients[:20]], 1)
+        print(f"age + gift of 20 cards: {elapsed * 1000:.2f} ms first time, "
+              f"{_timed(lambda: [(c.age, c.is_bday_gift_active) for c in clients[:20]], 100) * 1000:.3f} ms cached")
+
+#"who has a birthday gift today / birthdays this week" with the index vs checking everyone
+def bench_birthdays(size=100_000, repeat=50):
+    rng = random.Random(0)
+    clients = [
+        Client(p.id, p.name, p.last_name, f"{rng.randint(1950, 2007)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", p.phone)
+        for p in fake_people(size)
+    ]
+    today = date.today()
+
+    index = BirthdayIndex(clients)
+    start = time.perf_counter()
+    index.active_gifts(today)
+    print(f"index build ({size} clients): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    scan = _timed(lambda: [c for c in clients if c.gift_active_on(today)], 3)
+    print(f"active gifts, full scan: {scan * 1000:.1f} ms")
+    print(f"active gifts, index:     {_timed(lambda: index.active_gifts(today), repeat) * 1000:.2f} ms ({len(index.active_gifts(today))} clients)")
+    print(f"next 7 days, index:      {_timed(lambda: index.upcoming(today, 7), repeat) * 1000:.2f} ms")
+
+#the year file as the original per-day loop wrote it (monthcalendar lookup for every day)
+def _year_file_per_day(year):
+    import calendar
+    import csv
+    import io
+    from datetime import datetime
+
+    f = io.StringIO(newline="")
+    writer = csv.writer(f)
+    writer.writerow(["date", "day", "month", "week", "working_day"])
+
+    current = datetime(year, 1, 1)
+    end = datetime(year + 1, 1, 1)
+    week_index = 1
+
+    while current < end:
+        month_calendar = calendar.monthcalendar(year, current.month)
+        week_of_month = next(idx + 1 for idx, w in enumerate(month_calendar) if current.day in w)
+
+        weekday_index = current.weekday()
+        working = 0 if month_calendar[week_of_month - 1][weekday_index] == 0 else 1
+
+        if weekday_index < 5:
+            writer.writerow([current.strftime("%Y-%m-%d"), current.strftime("%A"), current.strftime("%B"), week_index, working])
+
+        if weekday_index == 6:
+            week_index += 1
+
+        current += timedelta(days=1)
+
+    return f.getvalue()
+
+#the month-by-month year files against the per-day loop they replaced, years 1900 on.
+#Fails unless every file is byte for byte the same.
+def bench_year_files(years=201):
+    from utils.year_builder import ensure_year_file
+
+    with _scratch():
+        start = time.perf_counter()
+        expected = {year: _year_file_per_day(year) for year in range(1900, 1900 + years)}
+        per_day = time.perf_counter() - start
+
+        start = time.perf_counter()
+        paths = {year: ensure_year_file(year) for year in expected}
+        monthly = time.perf_counter() - start
+
+        different = []
+        for year, path in paths.items():
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                if f.read() != expected[year]:
+                    different.append(year)
+
+    print(f"{years} years: per day {per_day * 1000:.0f} ms, month by month (written) {monthly * 1000:.0f} ms, "
+          f"different files: {different or '-'}")
+
+    if different:
+        raise SystemExit(f"year files differ from the per-day output: {different}")
+
+#one terminal of bench_concurrent: tries to book random slots for its own client, returns what it got
+def _stress_worker(path, client_id, attempts, days, seed):
+    from engine.schedule_engine import ScheduleEngine
+
+    os.chdir(path)
+    #small journal, so compactions (and the reloads they cause elsewhere) happen during the run
+    GlobalState.journal.limit = 8 * 1024
+    GlobalState.initialize()
+
+    engine = ScheduleEngine()
+    rng = random.Random(seed)
+    booked = []
+
+    for _ in range(attempts):
+        booking = (date.fromisoformat(rng.choice(days)), rng.choice(engine.employees), rng.choice(SLOTS), client_id)
+        if not engine.book_many([booking]):
+            booked.append((booking[0].isoformat(),) + booking[1:])
+
+    GlobalState.compact()
+    return booked
+
+#processes terminals booking the same few days at once against one data folder.
+#Every booking that was confirmed has to be in the final data, and no slot can be confirmed twice.
+def bench_concurrent(processes=4, attempts=200):
+    import multiprocessing
+    from utils.year_builder import is_working_day
+
+    with _scratch() as path:
+        gateway = DataGateway()
+        people = fake_people(processes + 3, seed=1)
+        gateway.save("employees.csv", [Employee(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[:3]])
+        gateway.save("clients.csv", [Client(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[3:]])
+
+        day = date.today()
+        days = []
+        while len(days) < 3:
+            day += timedelta(days=1)
+            if is_working_day(day):
+                days.append(day.isoformat())
+
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with context.Pool(processes) as pool:
+            results = pool.starmap(_stress_worker, [
+                (path, p.id, attempts, days, seed) for seed, p in enumerate(people[3:])
+            ])
+        elapsed = time.perf_counter() - start
+
+        confirmed = [booking for booked in results for booking in booked]
+        slots = {booking[:3] for booking in confirmed}
+
+        GlobalState.initialize()
+        schedule = GlobalState.schedule
+        lost = [b for b in confirmed if schedule.get_slot(date.fromisoformat(b[0]), b[1], b[2]) != b[3]]
+        stored = sum(1 for d, _, _, _ in schedule.bookings() if d in days)
+
+        print(f"{processes} processes x {attempts} attempts on {len(days) * 3 * len(SLOTS)} slots: {elapsed:.2f} s, "
+              f"{processes * attempts / elapsed:,.0f} attempts/s")
+        print(f"confirmed {len(confirmed)}, rejected {processes * attempts - len(confirmed)}, stored {stored}, "
+              f"double bookings {len(confirmed) - len(slots)}, lost {len(lost)}")
+
+        if len(confirmed) != len(slots) or lost or stored != len(confirmed):
+            raise SystemExit("double bookings, lost bookings or stored != confirmed")
+
+def _serve(path):
+    from utils.booking_server import BookingServer
+
+    os.chdir(path)
+    BookingServer().run()
+
+#terminals clients hammering one booking server on size clients: 60% availability, 30% client search,
+#10% bookings (each terminal books for its own client)
+def bench_server(size=10_000, terminals=10, requests=500):
+    import asyncio
+    import json
+    import multiprocessing
+    from utils.booking_server import SOCKET_PATH, BookingClient
+    from utils.year_builder import ensure_year_file
+
+    with _scratch() as path:
+        gateway = DataGateway()
+        people = fake_people(max(size, terminals) + 3, seed=2)
+        gateway.save("employees.csv", [Employee(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[:3]])
+        gateway.save("clients.csv", [Client(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[3:]])
+        ensure_year_file(date.today().year)
+        ensure_year_file(date.today().year + 1)
+
+        server = multiprocessing.get_context("spawn").Process(target=_serve, args=(path,))
+        start = time.perf_counter()
+        server.start()
+        try:
+            while True:
+                try:
+                    BookingClient(SOCKET_PATH).request("ping")
+                    break
+                except OSError:
+                    time.sleep(0.02)
+            print(f"server up ({len(people) - 3} clients loaded once): {time.perf_counter() - start:.2f} s")
+
+            async def terminal(seed, latencies):
+                rng = random.Random(seed)
+                reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
+                for _ in range(requests):
+                    roll = rng.random()
+                    day = (date.today() + timedelta(days=rng.randint(1, 30))).isoformat()
+                    if roll < 0.6:
+                        request = {"op": "availability", "date": day}
+                    elif roll < 0.9:
+                        request = {"op": "search", "query": rng.choice(people[3:]).last_name[:5]}
+                    else:
+                        request = {"op": "book", "client": people[3 + seed].id, "employee": rng.choice(people[:3]).id,
+                                   "date": day, "slots": [rng.choice(SLOTS)]}
+
+                    sent = time.perf_counter()
+                    writer.write((json.dumps(request) + "\n").encode("utf-8"))
+                    await writer.drain()
+                    json.loads(await reader.readline())
+                    latencies.append(time.perf_counter() - sent)
+                writer.close()
+
+            async def run():
+                latencies = []
+                await asyncio.gather(*(terminal(seed, latencies) for seed in range(terminals)))
+                return latencies
+
+            start = time.perf_counter()
+            latencies = sorted(asyncio.run(run()))
+            elapsed = time.perf_counter() - start
+
+            print(f"{terminals} terminals x {requests} requests: {len(latencies) / elapsed:,.0f} req/s, "
+                  f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+        finally:
+            server.terminate()
+            server.join()
+
+#the headless commands of main.py as a batch script would run them: a fresh process each,
+#on size clients (1000 of them come in through the import), a tenth of them booked by default.
+#Every command pays interpreter start + loading the data, that's part of the number.
+def bench_cli(size=100_000, bookings=None, employees=20):
+    import csv
+    import subprocess
+    import sys
+    from utils.year_builder import ensure_year_file, is_working_day
+
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+    #every booking goes to a different client already in clients.csv
+    bookings = bookings or size // 10
+    if size - 1000 < bookings:
+        raise SystemExit(f"cli needs a size of at least {bookings + 1000} for {bookings} bookings")
+
+    with _scratch() as path:
+        gateway = DataGateway()
+        people = fake_people(size + employees, seed=3)
+        clients = people[employees:-1000]
+        gateway.save("employees.csv", [Employee(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[:employees]])
+        gateway.save("clients.csv", [Client(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in clients])
+        ensure_year_file(date.today().year)
+        ensure_year_file(date.today().year + 1)
+
+        with open("new_clients.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "name", "last_name", "dob", "phone"])
+            #phones outside fake_people's range, so none of them is taken already
+            writer.writerows([p.id, p.name, p.last_name, "1990-01-01", f"12{i:08d}"] for i, p in enumerate(people[-1000:]))
+
+        #every slot of every employee on the next working days, until there are enough
+        slots = []
+        day = date.today()
+        while len(slots) < bookings:
+            day += timedelta(days=1)
+            if is_working_day(day):
+                slots.extend((day.isoformat(), f"02-{people[e].id}", slot) for e in range(employees) for slot in SLOTS)
+        with open("bookings.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["date", "employee", "slot", "client"])
+            writer.writerows(slot + (client.id,) for slot, client in zip(slots[:bookings], clients))
+
+        commands = [
+            ["import", "new_clients.csv"],
+            ["book", "--file", "bookings.csv"],
+            ["export", "clients", "--out", "clients_export.csv"],
+            ["export", "appointments", "--out", "appointments_export.csv"],
+            ["report", "birthdays", "--days", "30"],
+            ["cancel", "--file", "bookings.csv"],
+        ]
+        for command in commands:
+            start = time.perf_counter()
+            done = subprocess.run([sys.executable, main_py] + command, cwd=path, stdout=subprocess.DEVNULL)
+            print(f"{' '.join(command):<45} {time.perf_counter() - start:.2f} s (exit {done.returncode})")
+
+#ms the engine layer may take to import, measured in a fresh interpreter
+ENGINE_IMPORT_BUDGET = 100
+ENGINE_MODULES = ["engine.schedule_engine", "engine.client_store", "engine.employee_store"]
+
+#import time of the engine layer (no rich, no readchar, no data loaded) against the menu layer.
+#Fails when the engine goes over budget or pulls in a UI module.
+def bench_engine_import(repeat=7):
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import {modules}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(elapsed * 1000, ','.join(m for m in ('rich', 'readchar') if m in sys.modules) or '-')\n"
+    )
+
+    def measure(modules):
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", probe.format(modules=", ".join(modules))],
+                                 cwd=root, capture_output=True, text=True, check=True).stdout.split()
+            runs.append((float(out[0]), out[1]))
+        runs.sort()
+        return runs[len(runs) // 2]
+
+    engine_ms, engine_ui = measure(ENGINE_MODULES)
+    menu_ms, menu_ui = measure(["services.client_service", "services.schedule_service"])
+
+    print(f"engine import: {engine_ms:.1f} ms (budget {ENGINE_IMPORT_BUDGET} ms), ui modules: {engine_ui}")
+    print(f"services import: {menu_ms:.1f} ms, ui modules: {menu_ui}")
+
+    if engine_ms > ENGINE_IMPORT_BUDGET or engine_ui != "-":
+        raise SystemExit("engine import over budget or importing the UI")
+
+#runs main.py in a pseudo terminal, like a user would, and waits for text to show up
+class _Terminal:
+
+    def __init__(self, argv, cwd):
+        import fcntl
+        import pty
+        import struct
+        import subprocess
+        import termios
+
+        self.master, slave = pty.openpty()
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", 40, 120, 0, 0))
+        self.process = subprocess.Popen(argv, cwd=cwd, stdin=slave, stdout=slave, stderr=slave, close_fds=True)
+        os.close(slave)
+        self.output = b""
+
+    def wait_for(self, text, timeout=60):
+        import select
+
+        deadline = time.perf_counter() + timeout
+        while text.encode("utf-8") not in self.output:
+            if time.perf_counter() > deadline or not select.select([self.master], [], [], deadline - time.perf_counter())[0]:
+                raise TimeoutError(f"{text!r} never showed up")
+            self.output += os.read(self.master, 65536)
+        self.output = b""
+
+    def type(self, keys):
+        os.write(self.master, keys.encode("utf-8"))
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+        os.close(self.master)
+
+#time to the first menu, and until the client menu opens when the user picks it right away or
+#after looking at the menu for think seconds, with and without the background warm-up. Unix only (pty).
+def bench_startup(size=100_000, think=1.0):
+    import sys
+    from utils.year_builder import ensure_year_file
+
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+    with _scratch() as path:
+        gateway = DataGateway()
+        people = fake_people(size + 3, seed=4)
+        gateway.save("employees.csv", [Employee(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[:3]])
+        gateway.save("clients.csv", [Client(p.id, p.name, p.last_name, "1990-01-01", p.phone) for p in people[3:]])
+        ensure_year_file(date.today().year)
+
+        for flags in ([], ["--no-warmup"]):
+            for pause in (0, think):
+                terminal = _Terminal([sys.executable, main_py, "--fast"] + flags, path)
+                try:
+                    start = time.perf_counter()
+                    terminal.wait_for("Select an option")
+                    first_menu = time.perf_counter() - start
+
+                    time.sleep(pause)
+                    picked = time.perf_counter()
+                    terminal.type("1\n")
+                    terminal.wait_for("Register new Clients")
+                    waited = time.perf_counter() - picked
+                finally:
+                    terminal.close()
+
+                print(f"{' '.join(flags) or 'warm-up':<12} first menu {first_menu * 1000:4.0f} ms | "
+                      f"client menu {waited * 1000:4.0f} ms after picking it {pause:.1f} s later ({size} clients)")
+
+BENCHMARKS = {
+    "find": bench_find,
+    "book_many": bench_book_many,
+    "import": bench_import,
+    "memory": bench_memory,
+    "load": bench_load,
+    "birthdays": bench_birthdays,
+    "year_files": bench_year_files,
+    "concurrent": bench_concurrent,
+    "server": bench_server,
+    "cli": bench_cli,
+    "engine_import": bench_engine_import,
+    "startup": bench_startup,
+}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a benchmark on synthetic data.")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("size", type=int, nargs="?", help="dataset size")
+    args = parser.parse_args()
+
+    bench = BENCHMARKS[args.name]
+    bench(args.size) if args.size else bench()
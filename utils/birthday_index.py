@@ -0,0 +1,107 @@
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from repository.models.IPerson import IPerson, GIFT_DAYS
+
+#people sorted by birthday (month * 100 + day), so "whose birthday falls between these two days"
+#is two bisects instead of parsing everyone's dob. Ranges that cross new year are split in two.
+#Like SearchIndex it's only built the first time it's queried.
+class BirthdayIndex:
+
+    def __init__(self, items=()):
+        self._items = {}        #id(obj) -> obj, in insertion order
+        self._built = False
+        self._keys = []         #sorted birthday keys
+        self._people = []       #person of each key
+        self._key_of = {}       #id(obj) -> key it was indexed under
+
+        for obj in items:
+            self.add(obj)
+
+    @staticmethod
+    def key_of(obj):
+        dob = obj.dob
+        #the common YYYY-MM-DD case without going through strptime
+        if len(dob) == 10 and dob[4] == "-" and dob[7] == "-":
+            return int(dob[5:7]) * 100 + int(dob[8:10])
+
+        birthdate = obj.birthdate()
+        return birthdate.month * 100 + birthdate.day
+
+    def add(self, obj):
+        if id(obj) in self._items:
+            self.remove(obj)
+
+        self._items[id(obj)] = obj
+        if self._built:
+            self._insert(obj)
+
+    def remove(self, obj):
+        if self._items.pop(id(obj), None) is None or not self._built:
+            return
+
+        key = self._key_of.pop(id(obj))
+        for i in range(bisect_left(self._keys, key), bisect_right(self._keys, key)):
+            if self._people[i] is obj:
+                del self._keys[i]
+                del self._people[i]
+                return
+
+    #re-reads the dob of an object that changed
+    def update(self, obj):
+        self.add(obj)
+
+    #(birthday, person) for every birthday from start to end (both included, less than a year apart),
+    #in date order
+    def between(self, start: date, end: date):
+        self._build()
+
+        result = []
+        for year in range(start.year, end.year + 1):
+            lo = self._day_key(start) if year == start.year else 101
+            hi = self._day_key(end) if year == end.year else 1231
+
+            #the 29th of february counts as the 28th on other years
+            if hi == 228 and not calendar.isleap(year):
+                hi = 229
+
+            for i in range(bisect_left(self._keys, lo), bisect_right(self._keys, hi)):
+                key = self._keys[i]
+                result.append((IPerson.birthday_in(date(2000, key // 100, key % 100), year), self._people[i]))
+
+        result.sort(key=lambda entry: entry[0])
+        return result
+
+    #birthdays in the next days days, today included
+    def upcoming(self, start: date, days: int = 7):
+        return self.between(start, start + timedelta(days=min(days, 366) - 1))
+
+    #people with their birthday gift running on day: birthdays in the GIFT_DAYS days up to it
+    def active_gifts(self, day: date):
+        return [person for _, person in self.between(day - timedelta(days=GIFT_DAYS - 1), day)]
+
+    def _build(self):
+        if self._built:
+            return
+
+        self._built = True
+        #(key, insertion order) is unique, so the objects themselves never get compared
+        entries = sorted((self.key_of(obj), i, obj) for i, obj in enumerate(self._items.values()))
+        self._keys = [key for key, _, _ in entries]
+        self._people = [obj for _, _, obj in entries]
+        self._key_of = {id(obj): key for key, _, obj in entries}
+
+    def _insert(self, obj):
+        key = self.key_of(obj)
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._people.insert(i, obj)
+        self._key_of[id(obj)] = key
+
+    @staticmethod
+    def _day_key(day: date):
+        return day.month * 100 + day.day
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+from datetime import date
+
+from engine.client_store import ClientStore
+from engine.employee_store import EmployeeStore
+from engine.schedule_engine import ScheduleEngine
+from utils.data_gateway import DataGateway
+from utils.global_state import GlobalState
+
+SOCKET_PATH = "./repository/data/booking.sock"
+
+#raised by BookingClient when the server answers with an error
+class ServerError(Exception):
+    pass
+
+#optional daemon: one process loads GlobalState and the schedule engine once, and any number of
+#terminals book through it over a unix socket instead of each loading the whole dataset.
+#Protocol: one JSON object per line each way. Requests are {"op": ..., <arguments>}, answers are
+#{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+#Requests run one at a time on the event loop, so the engine never sees two at once.
+#run with: python main.py --serve [socket]   (terminals: python main.py --connect [socket])
+class BookingServer:
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self.clients = ClientStore()
+        self.employees = EmployeeStore()
+        self.schedule = ScheduleEngine()
+        self.handlers = {
+            "ping": lambda: "pong",
+            "book": self.book,
+            "cancel": self.cancel,
+            "availability": self.availability,
+            "openings": self.openings,
+            "search": self.search,
+        }
+
+    def load(self):
+        GlobalState.initialize()
+
+    def run(self):
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("The booking server needs unix sockets, which this system doesn't have.")
+
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            GlobalState.compact()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    async def serve(self):
+        self.load()
+
+        if os.path.exists(self.path):
+            if _is_listening(self.path):
+                raise RuntimeError(f"A booking server is already running on {self.path}.")
+            #left behind by a server that didn't shut down cleanly
+            os.remove(self.path)
+
+        #Ctrl+C or a plain kill stop the server cleanly (run() then compacts the journal)
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        async with server:
+            await stop.wait()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self.dispatch(line))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, line):
+        try:
+            request = json.loads(line)
+            handler = self.handlers.get(request.pop("op", None))
+            if handler is None:
+                raise ValueError("Unknown operation.")
+            response = {"ok": True, "result": handler(**request)}
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            response = {"ok": False, "error": str(e)}
+
+        return (json.dumps(response, separators=(",", ":")) + "\n").encode("utf-8")
+
+    #----------------------------------------------
+    #----------------OPERATIONS--------------------
+    #----------------------------------------------
+    #slots of one client, employee and day; or bookings as [[date, employee, slot, client], ...]
+    def book(self, client=None, employee=None, date=None, slots=(), bookings=None):
+        bookings = self._bookings(client, employee, date, slots, bookings)
+        return self._result(bookings, self.schedule.book_many(bookings))
+
+    def cancel(self, client=None, employee=None, date=None, slots=(), bookings=None):
+        bookings = self._bookings(client, employee, date, slots, bookings)
+        return self._result(bookings, self.schedule.cancel_many(bookings))
+
+    #{employee internal id: [free slots]} on date
+    def availability(self, date, employee=None):
+        GlobalState.sync()
+        return self.schedule.availability(_day(date), self._employee(employee).internal_id if employee else None)
+
+    #next openings of length slots in a row, as [{"date", "employee", "slots"}]
+    def openings(self, length=1, employee=None, count=5, start=None):
+        GlobalState.sync()
+        person = self._employee(employee) if employee else None
+        found = self.schedule.find_openings(int(length), person, _day(start) if start else None, int(count))
+        return [{"date": day.isoformat(), "employee": emp_id, "slots": slots} for day, emp_id, slots in found]
+
+    #ranked client matches as csv rows
+    def search(self, query, limit=10):
+        GlobalState.sync()
+        return [DataGateway.to_row(c) for c in self.clients.find(str(query), int(limit))]
+
+    def _bookings(self, client, employee, day, slots, bookings):
+        if bookings is None:
+            bookings = [(day, employee, slot, client) for slot in slots]
+        if not bookings:
+            raise ValueError("Nothing to book.")
+
+        result = []
+        for day, employee, slot, client in bookings:
+            if not self.clients.get(client):
+                raise ValueError(f"Unknown client {client}.")
+            result.append((_day(day), self._employee(employee).internal_id, slot, str(client)))
+        return result
+
+    #employees can be given by id or internal id
+    def _employee(self, value):
+        person = self.employees.resolve(value)
+        if person is None:
+            raise ValueError(f"Unknown employee {value}.")
+        return person
+
+    @staticmethod
+    def _result(bookings, conflicts):
+        return {
+            "done": 0 if conflicts else len(bookings),
+            "conflicts": [
+                {"date": day.isoformat(), "employee": emp_id, "slot": slot, "client": client_id, "reason": reason}
+                for (day, emp_id, slot, client_id), reason in conflicts
+            ],
+        }
+
+
+#blocking client for the server, one connection per terminal
+class BookingClient:
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rwb")
+
+    def request(self, op, **arguments):
+        arguments["op"] = op
+        self._file.write((json.dumps(arguments, separators=(",", ":")) + "\n").encode("utf-8"))
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The booking server closed the connection.")
+
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ServerError(response["error"])
+        return response["result"]
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+def _day(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+def _is_listening(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve bookings over a unix socket.")
+    parser.add_argument("path", nargs="?", default=SOCKET_PATH, help=f"socket path (default: {SOCKET_PATH})")
+    args = parser.parse_args()
+
+    BookingServer(args.path).run()
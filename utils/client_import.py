@@ -0,0 +1,87 @@
+import csv
+import os
+import sys
+
+from repository.models.client import Client
+from utils.data_gateway import DataGateway
+from utils.global_state import GlobalState
+from utils.journal import Journal
+
+#merges an external csv (same columns as clients.csv) into clients.csv.
+#Both files are streamed row by row, so memory doesn't grow with the size of the rows, only the
+#ids and phones already taken are kept to dedupe against. Rows that are invalid or clash with an
+#existing id/phone are skipped and written to the report as (line, id, phone, error).
+#run with: python -m utils.client_import new_clients.csv [--report errors.csv]
+REPORT_HEADER = ["line", "id", "phone", "error"]
+FIELDS = ("id", "name", "last_name", "dob", "phone")
+
+def import_clients(path, report_path=None, gateway=None, journal=None):
+    gateway = gateway or DataGateway()
+    journal = journal or Journal()
+    report_path = report_path or os.path.splitext(path)[0] + ".errors.csv"
+
+    ids = set()
+    phones = set()
+    added = 0
+    rejected = 0
+
+    with open(report_path, "w", encoding="utf-8", newline="") as report_file:
+        report = csv.writer(report_file, lineterminator="\n")
+        report.writerow(REPORT_HEADER)
+
+        def reject(line, row, error):
+            nonlocal rejected
+            rejected += 1
+            report.writerow([line, row.get("id") or "", row.get("phone") or "", str(error)])
+
+        #format first, then the ids and phones already taken (including earlier rows of the file)
+        def check(row):
+            for field in FIELDS:
+                error = Client.check_field(field, row[field])
+                if error:
+                    return error
+
+            if row["id"] in ids:
+                return "Someone with this ID already exists."
+            if row["phone"] in phones:
+                return "This phone number is already registered."
+            return None
+
+        #other terminals can't save while the snapshot is being rewritten, and the new journal
+        #epoch makes them reload it afterwards
+        with GlobalState.lock:
+            with gateway.writer("clients.csv", Client) as write:
+                for row in gateway.stream("clients.csv"):
+                    ids.add(row["id"])
+                    phones.add(row["phone"])
+                    write(row)
+
+                #clients saved since the last compaction only live in the journal
+                for entry in journal.replay():
+                    if entry.get("op") == "upsert" and entry.get("store") == "clients":
+                        ids.add(entry["row"].get("id"))
+                        phones.add(entry["row"].get("phone"))
+
+                for client in gateway.read(path, Client, on_error=reject, check=check):
+                    ids.add(client.id)
+                    phones.add(client.phone)
+                    write(client)
+                    added += 1
+
+            journal.new_epoch()
+
+    return added, rejected, report_path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge an external csv into clients.csv.")
+    parser.add_argument("path", help="csv with id,name,last_name,dob,phone columns")
+    parser.add_argument("--report", help="where to write the rejected rows (default: <path>.errors.csv)")
+    args = parser.parse_args()
+
+    added, rejected, report_path = import_clients(args.path, args.report)
+    print(f"{added} client(s) imported, {rejected} rejected.")
+    if rejected:
+        print(f"See {report_path}", file=sys.stderr)
@@ -1,5 +1,6 @@
 import csv
 import os
+from contextlib import contextmanager
 from typing import List, Union
 from dataclasses import fields, is_dataclass
 
@@ -10,30 +11,84 @@ class DataGateway:
         os.makedirs(base_path, exist_ok=True)
 
     def load(self, filename: str):
-        path = os.path.join(self.base_path, filename)
+        return list(self.stream(filename))
 
+    #rows of a data file one at a time. With a model every row is hydrated into it as it's read.
+    #check(row) can return an error message to refuse a row. A row that doesn't fit raises,
+    #or goes to on_error(line, row, error) and is skipped.
+    def stream(self, filename: str, model=None, on_error=None, check=None):
+        path = os.path.join(self.base_path, filename)
         if not os.path.exists(path):
-            return []
+            return
+
+        yield from self.read(path, model, on_error, check)
+
+    #same as stream() for any csv path, e.g. a file to import
+    @staticmethod
+    def read(path, model=None, on_error=None, check=None):
+        allowed = [f.name for f in fields(model) if f.init] if model else None
 
-        with open(path, "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8", newline="") as f:
             reader = csv.DictReader(f)
-            return list(reader)
-
-    def save(self, filename, items):
-        cleaned = []
-
-        for obj in items:
-            if is_dataclass(obj):
-                allowed = {f.name for f in fields(obj) if f.init}
-                row = {k: getattr(obj, k) for k in allowed}
-            else:
-                row = obj
-
-            cleaned.append(row)
-        
-        path = f"./repository/data/{filename}"
-        with open(path, "w", encoding="utf-8", newline="") as f:
-            field_order = [f.name for f in fields(obj.__class__) if f.init]
-            writer = csv.DictWriter(f, fieldnames=field_order)
-            writer.writeheader()
-            writer.writerows(cleaned)
+            for row in reader:
+                if model is None:
+                    yield row
+                    continue
+
+                try:
+                    missing = [name for name in allowed if row.get(name) is None]
+                    if missing:
+                        raise ValueError(f"missing {', '.join(missing)}")
+                    error = check(row) if check else None
+                    if error:
+                        raise ValueError(error)
+                    obj = model(**{name: row[name] for name in allowed})
+                except (TypeError, ValueError) as e:
+                    if on_error is None:
+                        raise
+                    on_error(reader.line_num, row, e)
+                    continue
+
+                yield obj
+
+    #model is only needed when items can be empty (so the header can still be written)
+    def save(self, filename, items, model=None):
+        items = iter(items)
+        first = next(items, None)
+        model = model or (first.__class__ if first is not None else None)
+
+        if model is None:
+            return
+
+        with self.writer(filename, model) as write:
+            if first is not None:
+                write(first)
+            for obj in items:
+                write(obj)
+
+    #write(obj) appends a row. The file is only replaced once the block ends without errors.
+    @contextmanager
+    def writer(self, filename, model):
+        path = os.path.join(self.base_path, filename)
+        temp_path = path + ".tmp"
+
+        try:
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                field_order = [f.name for f in fields(model) if f.init]
+                writer = csv.DictWriter(f, fieldnames=field_order)
+                writer.writeheader()
+                yield lambda obj: writer.writerow(self.to_row(obj))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def to_row(obj):
+        if not is_dataclass(obj):
+            return obj
+
+        allowed = [f.name for f in fields(obj) if f.init]
+        return {k: getattr(obj, k) for k in allowed}
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    #windows
+    fcntl = None
+    import msvcrt
+
+#advisory lock on a file, shared by every process that works on the same data folder.
+#Re-entrant inside a thread, so code holding it can call code that takes it again; other threads
+#of the same process (the warm-up) wait their turn like other processes do.
+class FileLock:
+
+    def __init__(self, path="./repository/data/.lock"):
+        self.path = path
+        self._file = None
+        self._depth = 0
+        self._owner = None
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        self._thread_lock.acquire()
+
+        if self._depth == 0:
+            try:
+                try:
+                    f = open(self.path, "a+b")
+                except FileNotFoundError:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    f = open(self.path, "a+b")
+                try:
+                    self._lock(f)
+                except BaseException:
+                    f.close()
+                    raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._file = f
+            self._owner = threading.get_ident()
+
+        self._depth += 1
+
+    def release(self):
+        if not self.held:
+            return
+
+        self._depth -= 1
+        if self._depth == 0:
+            f, self._file, self._owner = self._file, None, None
+            try:
+                self._unlock(f)
+            finally:
+                f.close()
+
+        self._thread_lock.release()
+
+    #by this thread
+    @property
+    def held(self):
+        return self._depth > 0 and self._owner == threading.get_ident()
+
+    @staticmethod
+    def _lock(f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            return
+
+        #msvcrt only locks byte ranges and gives up after ~10 s, so keep asking
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+    @staticmethod
+    def _unlock(f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -1,73 +1,298 @@
-import json
 import os
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
 from dataclasses import fields
 
 from utils.data_gateway import DataGateway
-from repository.models.schedule import Schedule
+from utils.file_lock import FileLock
+from utils.journal import Journal
+from utils.schedule_store import ScheduleStore
+from utils.search_index import SearchIndex
+from utils.birthday_index import BirthdayIndex
+from utils.year_builder import get_calendar
+from repository.models.schedule import SLOTS
 from repository.models.client import Client
 from repository.models.employee import Employee
 
 class GlobalState:
     _initialized = False
+    #initialize() can run on the warm-up thread and the main thread at once, only one loads
+    _init_lock = threading.Lock()
 
     clients = []
     employees = []
     schedule = None
 
+    #changes made since the last save, flushed to the journal by save()
+    _pending = []
+    journal = Journal()
+
+    #stores changed since the last compaction, only those get rewritten
+    _dirty = set()
+
+    #several terminals can share the data folder. Everything that writes, and anything that has to
+    #see the latest data before deciding (a booking), runs under this lock; see transaction()
+    lock = FileLock()
+
+    #store -> id -> stamp of the last journaled change of that record (none = as in the snapshot)
+    versions = {"clients": {}, "employees": {}}
+
+    #keyed lookups for each person store: store -> key -> value -> object
+    INDEX_KEYS = ("id", "internal_id", "phone")
+    indexes = {"clients": {}, "employees": {}}
+    search_indexes = {"clients": SearchIndex(), "employees": SearchIndex()}
+    birthday_indexes = {"clients": BirthdayIndex(), "employees": BirthdayIndex()}
+
+    #progress is an optional callback(done, total) to show how far along the load is.
+    #Everything that needs the data calls this first, so it's loaded on first use.
     @classmethod
-    def initialize(cls):
+    def initialize(cls, progress=None):
         if cls._initialized:
             return
 
+        #if the warm-up thread is already loading, this waits for it
+        with cls._init_lock:
+            if cls._initialized:
+                return
+
+            with cls.lock:
+                cls._load(progress)
+
+            cls._initialized = True
+
+    @classmethod
+    def is_loaded(cls):
+        return cls._initialized
+
+    #loads everything on a background thread, so it's (usually) ready by the time it's needed
+    @classmethod
+    def warm_up(cls):
+        def load():
+            try:
+                cls.initialize()
+                #the calendar of the booking window too
+                get_calendar(date.today().year)
+            except Exception:
+                #whoever needs the data next loads it again and gets to see the error
+                pass
+
+        threading.Thread(target=load, name="warm-up", daemon=True).start()
+
+    #reads the snapshots and the journal. The lists are refilled in place, services keep
+    #references to them.
+    @classmethod
+    def _load(cls, progress=None):
+        progress = progress or (lambda done, total: None)
         gateway = DataGateway()
 
-        cls.clients = gateway.load("clients.csv")
-        cls.employees = gateway.load("employees.csv")
+        #stamped records that come back unchanged keep their stamp, so what a user picked before
+        #someone compacted doesn't look changed
+        stamped = {
+            store: {id: (stamp, cls._row_of(store, id)) for id, stamp in cls.versions[store].items()}
+            for store in cls.versions
+        }
+
+        #rows are hydrated as they're read, the raw rows never pile up in a list
+        cls.clients[:] = gateway.stream("clients.csv", Client)
+        progress(1, 4)
+
+        cls.employees[:] = gateway.stream("employees.csv", Employee)
+
+        cls.reindex("clients")
+        cls.reindex("employees")
+        progress(2, 4)
+
+        #only the months of the booking window are read now, older ones load when asked for
+        today = date.today()
+        window = {today.isoformat()[:7], (today + timedelta(days=14)).isoformat()[:7]}
+        cls.schedule = ScheduleStore().load([e.internal_id for e in cls.employees], SLOTS, sorted(window))
+        progress(3, 4)
+
+        #snapshots are only as fresh as the last compaction, the journal has the rest
+        cls.versions = {"clients": {}, "employees": {}}
+        for store, kept in stamped.items():
+            for id, (stamp, row) in kept.items():
+                if row is not None and cls._row_of(store, id) == row:
+                    cls.versions[store][id] = stamp
+
+        cls._dirty = set()
+        for entry in cls.journal.replay():
+            cls._apply(entry)
+
+        cls._pending = []
+        progress(4, 4)
+
+    #----------------------------------------------
+    #----------------INDEXES--------------------
+    #----------------------------------------------
+    @classmethod
+    def reindex(cls, store):
+        cls.indexes[store] = {key: {} for key in cls.INDEX_KEYS}
+        cls.search_indexes[store] = SearchIndex()
+        cls.birthday_indexes[store] = BirthdayIndex()
+        for obj in getattr(cls, store):
+            cls.index(store, obj)
+
+    @classmethod
+    def index(cls, store, obj):
+        for key, table in cls.indexes[store].items():
+            table[str(getattr(obj, key))] = obj
+        cls.search_indexes[store].add(obj)
+        cls.birthday_indexes[store].add(obj)
+
+    #source is where the old key values come from (e.g. a copy taken before an update)
+    @classmethod
+    def unindex(cls, store, obj, source=None):
+        source = source or obj
+        for key, table in cls.indexes[store].items():
+            value = str(getattr(source, key))
+            if table.get(value) is obj:
+                del table[value]
+        cls.search_indexes[store].remove(obj)
+        cls.birthday_indexes[store].remove(obj)
+
+    @classmethod
+    def lookup(cls, store, key, value):
+        return cls.indexes[store][key].get(str(value))
+
+    @classmethod
+    def mark_dirty(cls, store):
+        cls._dirty.add(store)
+
+    @classmethod
+    def is_dirty(cls, store):
+        return store in cls._dirty
+
+    #queues a change to be written on the next save(). Person changes get a new version stamp.
+    @classmethod
+    def record(cls, op, **payload):
+        payload["op"] = op
+        if op == "upsert":
+            payload["version"] = os.urandom(6).hex()
+        if op in ("upsert", "remove"):
+            cls._set_version(payload)
+        cls._pending.append(payload)
 
-        cls.clients = [
-            cls.hydrate(Client, row) if isinstance(row, dict) else row
-            for row in cls.clients
-        ]
+    #the stamp, or for a record nobody changed since the snapshot its row ("" = no such record).
+    #Either way it changes when the record does, compactions and reloads included.
+    @classmethod
+    def version_of(cls, store, id):
+        stamp = cls.versions[store].get(str(id))
+        if stamp:
+            return stamp
 
-        cls.employees = [
-            cls.hydrate(Employee, row) if isinstance(row, dict) else row
-            for row in cls.employees
-        ]
+        row = cls._row_of(store, id)
+        return "|".join(map(str, row.values())) if row else ""
 
-        schedule_path = "./repository/data/schedule.json"
-        cls.schedule = {}
+    @classmethod
+    def _row_of(cls, store, id):
+        obj = cls.lookup(store, "id", id)
+        return DataGateway.to_row(obj) if obj is not None else None
 
-        if os.path.exists(schedule_path):
+    #----------------------------------------------
+    #----------------PERSISTENCE--------------------
+    #----------------------------------------------
+    #runs the block with the lock held and the latest data from every terminal loaded, then saves.
+    #Check-then-write code (is the slot still free? did someone edit this client?) goes in here.
+    #Nested transactions just join the outer one. If the block raises nothing is saved, and
+    #whatever it already changed in memory is thrown away by reloading.
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        #loads first (or waits for the warm-up), always before taking the lock
+        cls.initialize()
+        outer = not cls.lock.held
+
+        with cls.lock:
+            if outer:
+                cls.sync()
             try:
-                with open(schedule_path, "r", encoding="utf-8") as f:
-                    content = f.read().strip()
-                    cls.schedule = json.loads(content) if content else {}
-            except json.JSONDecodeError:
-                cls.schedule = {}
+                yield
+            except BaseException:
+                if outer:
+                    cls._load()
+                raise
+
+            if outer:
+                cls.save()
+
+    #catches up with what the other processes saved since we last looked.
+    #Returns True if anything came in.
+    @classmethod
+    def sync(cls):
+        if not cls._initialized:
+            return False
 
-        cls._initialized = True
+        with cls.lock:
+            entries = cls.journal.read_new()
 
+            if entries is None:
+                #someone compacted (or imported), the snapshots are newer than our copy
+                cls._load()
+                return True
+
+            for entry in entries:
+                cls._apply(entry)
+            return bool(entries)
+
+    #appends the pending changes to the journal. The cost depends on the size of the change,
+    #not on the size of the data. The snapshots are only rewritten once the journal grows too big.
     @classmethod
     def save(cls):
-        gateway = DataGateway()
+        with cls.lock:
+            cls._flush()
 
-        if cls.clients:
-            gateway.save("clients.csv", cls.clients)
+            if cls.journal.needs_compaction():
+                cls.compact()
 
-        if cls.employees:
-            gateway.save("employees.csv", cls.employees)
+    #writes the in-memory state to the csv snapshots and empties the journal
+    @classmethod
+    def compact(cls):
+        if not cls._initialized:
+            return
 
-        schedule_path = "./repository/data/schedule.json"
-        temp_path = schedule_path + ".tmp"
+        with cls.lock:
+            cls._flush()
 
-        with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(cls.schedule, f, indent=2)
+            #nothing changed since the snapshots, a new epoch would only make everyone reload
+            if not cls._dirty and cls.journal.is_empty():
+                return
 
-        os.replace(temp_path, schedule_path)
+            gateway = DataGateway()
 
-        
-        cls._initialized = False
-        cls.initialize()
+            if cls.is_dirty("clients"):
+                gateway.save("clients.csv", cls.clients, Client)
+
+            if cls.is_dirty("employees"):
+                gateway.save("employees.csv", cls.employees, Employee)
+
+            if cls.is_dirty("schedule"):
+                ScheduleStore().save(cls.schedule)
+
+            #a new epoch, the other terminals reload from the snapshots we just wrote.
+            #the stamps stay, our records are exactly what was written
+            cls.journal.clear()
+            cls._dirty = set()
+
+    #our pending changes go after whatever the others saved meanwhile. If something came in,
+    #ours are applied again on top so memory ends up in journal order, like everyone else's.
+    @classmethod
+    def _flush(cls):
+        pending, cls._pending = cls._pending, []
+
+        if cls.sync():
+            for entry in pending:
+                cls._apply(entry)
+
+        cls.journal.append(pending)
+
+    @classmethod
+    def _set_version(cls, entry):
+        versions = cls.versions[entry["store"]]
+        versions.pop(str(entry["id"]), None)
+        if entry["op"] == "upsert":
+            versions[str(entry["row"]["id"])] = entry.get("version", "")
 
     @staticmethod
     def hydrate(model, row):
@@ -75,4 +300,51 @@ class GlobalState:
         for f in fields(model):
             if f.init and f.name in row:
                 ordered[f.name] = row[f.name]
-        return model(**ordered)
\ No newline at end of file
+        return model(**ordered)
+
+    #replays a single journal entry on top of the loaded snapshots.
+    #every op is idempotent so replaying after a half finished compaction is safe.
+    @classmethod
+    def _apply(cls, entry):
+        op = entry.get("op")
+
+        if op in ("upsert", "remove"):
+            model = Client if entry["store"] == "clients" else Employee
+            store = entry["store"]
+            items = getattr(cls, store)
+            cls.mark_dirty(store)
+
+            current = cls.lookup(store, "id", entry["id"])
+            cls._set_version(entry)
+
+            if op == "remove":
+                if current is not None:
+                    items.remove(current)
+                    cls.unindex(store, current)
+                return
+
+            obj = cls.hydrate(model, entry["row"])
+            if current is None:
+                current = cls.lookup(store, "id", obj.id)
+
+            if current is None:
+                items.append(obj)
+                #a new employee needs a column to be booked (an id change comes as rename_employee)
+                if model is Employee and cls.schedule is not None:
+                    cls.schedule.add_employee(obj.internal_id)
+            else:
+                items[items.index(current)] = obj
+                cls.unindex(store, current)
+
+            cls.index(store, obj)
+            return
+
+        sched = cls.schedule
+        cls.mark_dirty("schedule")
+
+        if op == "slot":
+            sched.set_slot(date.fromisoformat(entry["date"]), entry["employee"], entry["slot"], entry["value"])
+        elif op == "drop_employee":
+            sched.drop_employee(entry["employee"], entry["since"])
+        elif op == "rename_employee":
+            sched.rename_employee(entry["old"], entry["new"])
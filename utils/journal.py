@@ -0,0 +1,134 @@
+import json
+import os
+
+#append-only change log. Every save appends the changes made since the last one
+#(one JSON object per line) instead of rewriting the whole dataset.
+#On startup the entries are replayed on top of the csv snapshots.
+#
+#Several processes can share it (always under GlobalState.lock): offset is how far this process
+#has read, so read_new() only returns what the others appended since. A compaction starts a new
+#epoch (the first line), which tells the other processes their offset is meaningless and they
+#have to reload the snapshots.
+class Journal:
+
+    def __init__(self, path="./repository/data/journal.log", limit=256 * 1024):
+        self.path = path
+        self.limit = limit
+        self.offset = 0
+        self.epoch = None
+
+    def append(self, entries):
+        if not entries:
+            return
+
+        lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+        with open(self.path, "ab") as f:
+            #a crash mid-write leaves half a line, finish it so the next entry starts clean
+            if f.tell() and not self._ends_with_newline():
+                lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            #callers hold the lock and have read everything before this, so we're up to date
+            self.offset = f.tell()
+
+    #every entry from the start, and this process is caught up afterwards
+    def replay(self):
+        self.offset = 0
+        self.epoch = self._read_epoch()
+        yield from self._read_from_offset()
+
+    #entries appended by other processes since the last read, or None if the journal was
+    #compacted meanwhile (everything has to be reloaded from the snapshots)
+    def read_new(self):
+        if self._read_epoch() != self.epoch or self.size() < self.offset:
+            return None
+        return list(self._read_from_offset())
+
+    def size(self):
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path)
+
+    #nothing in it but the epoch line
+    def is_empty(self):
+        if not os.path.exists(self.path):
+            return True
+
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    #a torn line still counts, it was a change
+                    return False
+                if isinstance(entry, dict) and entry.get("op") != "epoch":
+                    return False
+
+        return True
+
+    def needs_compaction(self):
+        return self.size() > self.limit
+
+    def clear(self):
+        self._write_epoch([])
+
+    #same entries under a new epoch, for when the snapshots changed under everyone (an import)
+    def new_epoch(self):
+        self.offset = 0
+        self._write_epoch(list(self._read_from_offset()))
+
+    def _write_epoch(self, entries):
+        self.epoch = os.urandom(8).hex()
+        lines = [{"op": "epoch", "id": self.epoch}] + entries
+        temp_path = self.path + ".tmp"
+
+        with open(temp_path, "wb") as f:
+            f.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self.offset = f.tell()
+
+        os.replace(temp_path, self.path)
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _read_epoch(self):
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, "rb") as f:
+            try:
+                first = json.loads(f.readline())
+            except ValueError:
+                return None
+
+        return first.get("id") if isinstance(first, dict) and first.get("op") == "epoch" else None
+
+    def _read_from_offset(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                #a line without its newline is still being written (or was torn by a crash),
+                #it's read again next time
+                if not line.endswith(b"\n"):
+                    return
+                if not line.strip():
+                    self.offset += len(line)
+                    continue
+                self.offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    #torn write from a crash, append() closed it with a newline
+                    continue
+
+                if entry.get("op") != "epoch":
+                    yield entry
@@ -2,6 +2,8 @@
 from typing import List, Tuple
 from datetime import datetime
 from math import ceil
+from contextlib import contextmanager
+import os
 import random
 import time
 
@@ -16,17 +18,29 @@ from rich.progress import Progress, BarColumn, TimeRemainingColumn
 from rich.live import Live
 from rich.columns import Columns
 
-#live search
-from readchar import readkey
-
 #data creation
 from utils.year_builder import read_filtered, read_month
+from utils.search_index import SearchIndex
 
 
 
 class RichUI:
     console = Console()
 
+    #how much waiting the UI does:
+    #   "real"    -> only real work (loading/saving data) shows a progress bar
+    #   "fast"    -> no bars and no delays at all
+    #   "classic" -> the original fake loading bar on every screen
+    PROFILES = ("real", "fast", "classic")
+    profile = os.environ.get("POOIFTS_UI", "real").lower()
+
+    @staticmethod
+    def set_profile(profile: str):
+        profile = profile.lower()
+        if profile not in RichUI.PROFILES:
+            raise ValueError(f"Unknown UI profile '{profile}'. Use one of: {', '.join(RichUI.PROFILES)}")
+        RichUI.profile = profile
+
     #----------------------------------------------
     #----------------------------------------------
     #----------------MENUS--------------------
@@ -113,46 +127,22 @@ class RichUI:
         RichUI.show_loading_message(". . .")
         return choice == "Y"
     
+    #index is a SearchIndex kept up to date by the caller. Without one, a throwaway index is built.
     @staticmethod
-    def live_search(items, label="Search"):
+    def live_search(items, label="Search", index=None):
+        #readchar is slow to import and only live search needs it, so it's not paid at startup
+        from readchar import readkey
+
         query = ""
+        session = (index or SearchIndex(items)).session()
 
-        search_tables = [
-            (
-                item,
-                f"{getattr(item, 'id', '')} {getattr(item, 'name', '')} {getattr(item, 'last_name', '')} {getattr(item, 'phone', '')}".lower()
-            )
-            for item in items
-        ]
+        RichUI.clear()
 
-        with Live(refresh_per_second=30, console=RichUI.console):
+        #the screen is drawn once and then only updated in place
+        with Live(RichUI._search_view(label, query, session.query(query)), console=RichUI.console, auto_refresh=False) as live:
             while True:
-                RichUI.clear()
-
-                panel = Panel.fit(
-                    f"{label}: {query}\n(ENTER = select, BACKSPACE = delete, ESC = cancel)",
-                    border_style="bright_blue"
-                )
-                RichUI.center(panel)
-
-                results = [obj for obj, text in search_tables if query.lower() in text]
-
-                table = Table(show_header=True, header_style="bold cyan", box=None)
-                table.add_column("ID")
-                table.add_column("Name")
-                table.add_column("Phone")
-
-                for obj in results[:10] if results else []:
-                    table.add_row(
-                        getattr(obj, "id", ""),
-                        f"{getattr(obj, 'name', '')} {getattr(obj, 'last_name', '')}",
-                        getattr(obj, "phone", "")
-                    )
-
-                if not results:
-                    table.add_row("No results", "", "")
-
-                RichUI.center(table)
+                results = session.query(query)
+                live.update(RichUI._search_view(label, query, results), refresh=True)
 
                 key = readkey()
 
@@ -168,7 +158,31 @@ class RichUI:
 
                 if key.isprintable():
                     query += key
-    
+
+    @staticmethod
+    def _search_view(label, query, results):
+        panel = Panel.fit(
+            f"{label}: {query}\n(ENTER = select, BACKSPACE = delete, ESC = cancel)",
+            border_style="bright_blue"
+        )
+
+        table = Table(show_header=True, header_style="bold cyan", box=None)
+        table.add_column("ID")
+        table.add_column("Name")
+        table.add_column("Phone")
+
+        for obj in results[:10]:
+            table.add_row(
+                getattr(obj, "id", ""),
+                f"{getattr(obj, 'name', '')} {getattr(obj, 'last_name', '')}",
+                getattr(obj, "phone", "")
+            )
+
+        if not results:
+            table.add_row("No results", "", "")
+
+        return Group(Align.center(panel), Align.center(table))
+
     @staticmethod
     def prompt_edit(label, old_value):
         response = Prompt.ask(f"{label} ([dim]{old_value}[/dim])", default=str(old_value))
@@ -188,14 +202,11 @@ class RichUI:
     def pick_calendar_date(rows):
         RichUI._show_calendar(rows)
 
-        valid_keys = {str(i+1): r["date"] for i, r in enumerate(rows)}
+        valid_keys = {str(i+1): r["dt"] for i, r in enumerate(rows)}
 
         choice = RichUI._option_select(list(valid_keys.keys()), default_opt="1")
 
-        try:
-            return datetime.strptime(valid_keys[choice], "%Y-%m-%d").date()
-        except:
-            return None
+        return valid_keys.get(choice)
     
     @staticmethod
     def pick_employee(employee_list):
@@ -280,8 +291,12 @@ class RichUI:
     #----------------------------------------------
     #----------------------------------------------
 
+    #navigation screens only get the (fake) loading bar on the classic profile
     @staticmethod
     def show_loading_message(message: str):
+        if RichUI.profile != "classic":
+            return
+
         panel = Panel.fit(
             f"[bold cyan]Loading {message}[/bold cyan]",
             border_style="bright_blue"
@@ -290,6 +305,30 @@ class RichUI:
         RichUI.center(panel)
         RichUI._show_loading_bar()
 
+    #progress bar driven by actual work. Yields update(done, total) for the work to call.
+    @staticmethod
+    @contextmanager
+    def progress(message: str):
+        if RichUI.profile == "fast":
+            yield lambda done, total: None
+            return
+
+        RichUI.center(Panel.fit(
+            f"[bold cyan]{message}[/bold cyan]",
+            border_style="bright_blue"
+        ))
+
+        progress = Progress(BarColumn(), expand=False, console=RichUI.console)
+        task = progress.add_task("", total=1)
+
+        def update(done, total):
+            progress.update(task, completed=done, total=total)
+
+        with Live(Align.center(progress), refresh_per_second=30, console=RichUI.console):
+            yield update
+
+        RichUI.clear()
+
     #----------------------------------------------
     #----------------------------------------------
     #----------------DISPLAY--------------------
@@ -336,6 +375,9 @@ class RichUI:
 
             header = headers[index]
             items = groups[header]
+            #a section can be a callable so its lines are only built when the page is shown
+            if callable(items):
+                items = groups[header] = items()
 
             RichUI.console.print(f"\n[bold]{header}[/bold]\n" + "─" * len(header))
             for line in items:
@@ -388,7 +430,7 @@ class RichUI:
         last_weekday = None
 
         for idx, entry in enumerate(rows, start=1):
-            dt = datetime.strptime(entry["date"], "%Y-%m-%d").date()
+            dt = entry["dt"]
             weekday = dt.weekday()  # 0 = Mon
 
             # new calendar row when weekday resets
@@ -0,0 +1,116 @@
+import csv
+import json
+import os
+
+from repository.models.schedule import Schedule
+
+#sparse schedule persistence, partitioned by month: schedule/YYYY-MM.csv holds one row per
+#booked slot of that month (date, employee, slot, client). Free slots are never written, only
+#the months around today are read at startup, and a save only rewrites the months that changed.
+class ScheduleStore:
+    HEADER = ["date", "employee", "slot", "client"]
+
+    def __init__(self, base_path="./repository/data"):
+        self.base_path = base_path
+        self.dir = os.path.join(base_path, "schedule")
+        self.flat_path = os.path.join(base_path, "schedule.csv")
+        self.legacy_path = os.path.join(base_path, "schedule.json")
+
+    #months is the list of "YYYY-MM" partitions to read right away
+    def load(self, employees, slots, months=()):
+        self._migrate()
+
+        sched = Schedule(employees, slots)
+        sched.attach(self, months)
+        return sched
+
+    def save(self, schedule):
+        os.makedirs(self.dir, exist_ok=True)
+
+        for month in sorted(schedule.dirty_months):
+            rows = schedule.month_bookings(month)
+            path = self._month_path(month)
+
+            if not rows:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+
+            temp_path = path + ".tmp"
+
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(self.HEADER)
+                writer.writerows(rows)
+
+            os.replace(temp_path, path)
+
+        schedule.dirty_months = set()
+
+    def months(self):
+        if not os.path.isdir(self.dir):
+            return []
+
+        return sorted(name[:-4] for name in os.listdir(self.dir) if name.endswith(".csv"))
+
+    def rows(self, month):
+        path = self._month_path(month)
+        if not os.path.exists(path):
+            return
+
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) == 4:
+                    yield row
+
+    #rewrites schedule.json as monthly partitions and keeps the json around as schedule.json.bak
+    def convert(self):
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+                data = json.loads(content) if content else {}
+        except json.JSONDecodeError:
+            data = {}
+
+        slots = sorted({slot for day in data.values() for emp in day.values() for slot in emp})
+        self._save_all(Schedule.from_dict(data, [], slots))
+
+        os.replace(self.legacy_path, self.legacy_path + ".bak")
+        return self.dir
+
+    #older data folders have a single schedule.json or schedule.csv, split them once
+    def _migrate(self):
+        if os.path.isdir(self.dir):
+            return
+
+        if os.path.exists(self.flat_path):
+            with open(self.flat_path, "r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                rows = [row for row in reader if len(row) == 4]
+
+            sched = Schedule([], sorted({row[2] for row in rows}))
+            sched.load_bookings(rows)
+            self._save_all(sched)
+
+            os.replace(self.flat_path, self.flat_path + ".bak")
+
+        elif os.path.exists(self.legacy_path):
+            self.convert()
+
+    def _save_all(self, schedule):
+        schedule.dirty_months = {d[:7] for d in schedule.days}
+        self.save(schedule)
+
+    def _month_path(self, month):
+        return os.path.join(self.dir, f"{month}.csv")
+
+
+if __name__ == "__main__":
+    store = ScheduleStore()
+    if not os.path.exists(store.legacy_path):
+        print(f"Nothing to convert, {store.legacy_path} not found.")
+    else:
+        print(store.convert())
@@ -0,0 +1,327 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import heappush, heapreplace
+
+#trigram index over the searchable text of a collection (id, name, last name, phone).
+#A query of 3+ characters only looks at the items sharing all of its trigrams,
+#shorter ones fall back to a substring scan.
+#The trigrams are only built the first time they're needed, so loading data stays cheap.
+class SearchIndex:
+    FIELDS = ("id", "name", "last_name", "phone")
+
+    def __init__(self, items=()):
+        self._items = {}    #key -> (order, obj, text), in insertion order
+        self._grams = None  #trigram -> {key}
+        self._counter = 0
+
+        #structures for find(), also built on first use. Names are matched token by token
+        #against the (much smaller) vocabulary of distinct name words.
+        self._ranked = False
+        self._ids = {}          #id -> key
+        self._phones = []       #sorted [(phone, key)]
+        self._tokens = {}       #name word -> {key: None}, in insertion order
+        self._vocab = []        #sorted name words
+        self._vocab_grams = {}  #padded trigram -> {name word}
+        self._key_tokens = {}   #key -> name words of that item
+        self._key_fields = {}   #key -> (id, phone) it was indexed under, the object may have changed since
+
+        for obj in items:
+            self.add(obj)
+
+    @classmethod
+    def text_of(cls, obj):
+        return " ".join(str(getattr(obj, f, "")) for f in cls.FIELDS).lower()
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, obj):
+        key = id(obj)
+        if key in self._items:
+            self.remove(obj)
+
+        text = self.text_of(obj)
+        self._items[key] = (self._counter, obj, text)
+        self._counter += 1
+
+        if self._grams is not None:
+            self._add_grams(key, text)
+
+        if self._ranked:
+            self._add_ranked(key, obj)
+
+    def remove(self, obj):
+        entry = self._items.pop(id(obj), None)
+        if entry is None:
+            return
+
+        if self._ranked:
+            self._remove_ranked(id(obj))
+
+        if self._grams is None:
+            return
+
+        for gram in self.trigrams(entry[2]):
+            keys = self._grams.get(gram)
+            if keys:
+                keys.discard(id(obj))
+                if not keys:
+                    del self._grams[gram]
+
+    #re-reads the text of an object whose fields changed
+    def update(self, obj):
+        self.add(obj)
+
+    #every item whose text contains query, in insertion order
+    def query(self, query, candidates=None):
+        query = query.lower()
+
+        if candidates is None:
+            if len(query) < 3:
+                return [obj for _, obj, text in self._items.values() if query in text]
+            else:
+                candidates = self._candidates(query)
+
+        items = self._items
+        return [obj for obj in candidates if query in items[id(obj)][2]]
+
+    #ranked matches: exact id first, then phone prefix, then names by trigram similarity
+    #(so a typo or two still finds the person). Returns at most limit objects.
+    def find(self, query, limit=10):
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        self._build_ranked()
+
+        found = []
+        seen = set()
+
+        def take(key):
+            if key not in seen:
+                seen.add(key)
+                found.append(self._items[key][1])
+            return len(found) >= limit
+
+        if query.isdigit():
+            key = self._ids.get(query)
+            if key is not None and take(key):
+                return found
+
+            phones = self._phones
+            for i in range(bisect_left(phones, (query,)), len(phones)):
+                phone, key = phones[i]
+                if not phone.startswith(query) or take(key):
+                    break
+
+            if len(found) >= limit:
+                return found
+
+        for key in self._fuzzy(query.split(), limit):
+            if take(key):
+                break
+
+        return found
+
+    #remembers the results of every prefix typed so far, so each new keystroke only
+    #filters the previous results and backspace is free
+    def session(self):
+        return SearchSession(self)
+
+    def _add_grams(self, key, text):
+        for gram in self.trigrams(text):
+            keys = self._grams.get(gram)
+            if keys is None:
+                self._grams[gram] = {key}
+            else:
+                keys.add(key)
+
+    @staticmethod
+    def _name_tokens(obj):
+        return tuple(f"{getattr(obj, 'name', '')} {getattr(obj, 'last_name', '')}".lower().split())
+
+    def _build_ranked(self):
+        if self._ranked:
+            return
+
+        self._ranked = True
+        for key, (_, obj, _) in self._items.items():
+            self._add_ranked(key, obj, sort=False)
+
+        self._phones.sort()
+        self._vocab.sort()
+
+    def _add_ranked(self, key, obj, sort=True):
+        id_, phone = str(getattr(obj, "id", "")), str(getattr(obj, "phone", ""))
+        self._key_fields[key] = (id_, phone)
+        self._ids[id_] = key
+
+        entry = (phone, key)
+        if sort:
+            insort(self._phones, entry)
+        else:
+            self._phones.append(entry)
+
+        tokens = self._name_tokens(obj)
+        self._key_tokens[key] = tokens
+
+        for token in tokens:
+            keys = self._tokens.get(token)
+            if keys is None:
+                keys = self._tokens[token] = {}
+                if sort:
+                    insort(self._vocab, token)
+                else:
+                    self._vocab.append(token)
+                for gram in self.trigrams(f" {token} "):
+                    self._vocab_grams.setdefault(gram, set()).add(token)
+            keys[key] = None
+
+    def _remove_ranked(self, key):
+        id_, phone = self._key_fields.pop(key, ("", ""))
+        if self._ids.get(id_) == key:
+            del self._ids[id_]
+
+        entry = (phone, key)
+        idx = bisect_left(self._phones, entry)
+        if idx < len(self._phones) and self._phones[idx] == entry:
+            self._phones.pop(idx)
+
+        for token in self._key_tokens.pop(key, ()):
+            keys = self._tokens.get(token)
+            if keys is None:
+                continue
+
+            keys.pop(key, None)
+            if keys:
+                continue
+
+            #last person with that word, drop it from the vocabulary too
+            del self._tokens[token]
+            idx = bisect_left(self._vocab, token)
+            if idx < len(self._vocab) and self._vocab[idx] == token:
+                self._vocab.pop(idx)
+            for gram in self.trigrams(f" {token} "):
+                words = self._vocab_grams.get(gram)
+                if words:
+                    words.discard(token)
+                    if not words:
+                        del self._vocab_grams[gram]
+
+    #name words similar to a query word, with a score: 1 exact, 0.9 prefix,
+    #otherwise the trigram dice coefficient (typos) if it's at least 0.4
+    def _match_word(self, word):
+        scores = {}
+
+        vocab = self._vocab
+        i = bisect_left(vocab, word)
+        while i < len(vocab) and vocab[i].startswith(word) and len(scores) < 100:
+            scores[vocab[i]] = 1.0 if vocab[i] == word else 0.9
+            i += 1
+
+        grams = self.trigrams(f" {word} ")
+        if len(word) >= 3:
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._vocab_grams.get(gram, ()))
+
+            for token, count in shared.items():
+                if token in scores:
+                    continue
+                dice = 2 * count / (len(grams) + len(token))
+                if dice >= 0.4:
+                    scores[token] = dice
+
+        #a close match makes the far fetched ones noise
+        best = max(scores.values(), default=0)
+        return {token: score for token, score in scores.items() if score >= best * 0.75}
+
+    #best name matches: every query word has to match one of the person's words.
+    #Walks the most selective word's matches from best to worst and stops as soon as
+    #nothing left can beat the current top results.
+    def _fuzzy(self, words, limit):
+        matches = [self._match_word(word) for word in words]
+        if not matches or not all(matches):
+            return []
+
+        matches.sort(key=lambda scores: sum(len(self._tokens[t]) for t in scores))
+        lead, others = matches[0], matches[1:]
+        best_others = sum(max(scores.values()) for scores in others)
+
+        items = self._items
+        top = []    #min-heap of (score, -order, key)
+        seen = set()
+
+        for token, score in sorted(lead.items(), key=lambda t: -t[1]):
+            if len(top) >= limit and score + best_others <= top[0][0]:
+                break
+
+            for key in self._tokens[token]:
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                #tokens come best first, so score already is this person's best for the lead word
+                person = self._key_tokens[key]
+                total = score
+                for scores in others:
+                    best = 0
+                    for t in person:
+                        value = scores.get(t)
+                        if value and value > best:
+                            best = value
+                    if not best:
+                        break
+                    total += best
+                else:
+                    entry = (total, -items[key][0], key)
+                    if len(top) < limit:
+                        heappush(top, entry)
+                    elif entry > top[0]:
+                        heapreplace(top, entry)
+
+        return [key for _, _, key in sorted(top, reverse=True)]
+
+    def _candidates(self, query):
+        if self._grams is None:
+            self._grams = {}
+            for key, (_, _, text) in self._items.items():
+                self._add_grams(key, text)
+
+        postings = []
+        for gram in self.trigrams(query):
+            keys = self._grams.get(gram)
+            if not keys:
+                return []
+            postings.append(keys)
+
+        postings.sort(key=len)
+        keys = set(postings[0]).intersection(*postings[1:])
+
+        entries = sorted((self._items[k] for k in keys), key=lambda e: e[0])
+        return [entry[1] for entry in entries]
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SearchSession:
+
+    def __init__(self, index):
+        self.index = index
+        self._history = [("", None)]    #(query, results) for every prefix typed
+
+    def query(self, query):
+        query = query.lower()
+
+        while len(self._history) > 1 and not query.startswith(self._history[-1][0]):
+            self._history.pop()
+
+        last_query, last_results = self._history[-1]
+        if query == last_query and last_results is not None:
+            return last_results
+
+        results = self.index.query(query, last_results)
+        self._history.append((query, results))
+        return results
@@ -1,6 +1,8 @@
 import os
 import csv
-from datetime import datetime, timedelta
+import tempfile
+from datetime import date, datetime, timedelta
+from bisect import bisect_left, bisect_right
 import calendar
 
 DATA_PATH = "./repository/data"
@@ -18,95 +20,123 @@ def ensure_year_file(year: int):
 	
 	os.makedirs(DATA_PATH, exist_ok=True)
 
-	#open the newly made .csv file with the year
-	with open(filepath, "w", newline="", encoding="utf-8") as f:
-		writer = csv.writer(f)
+	#build the whole file in memory and write it in one go
+	lines = ["date,day,month,week,working_day"]
+	lines.extend(",".join(map(str, row)) for row in _year_rows(year))
 
-		writer.writerow(["date", "day", "month", "week", "working_day"])
-
-		start = datetime(year, 1, 1)
-		end = datetime(year + 1, 1, 1)
-
-		current = start
-		week_index = 1
-
-		while current < end:
-
-			#2d representation of a month
-			month_calendar = calendar.monthcalendar(year, current.month)
-			week_of_month = None
-
-			#checks which days of that month are valid
-			for idx, w in enumerate(month_calendar):
-				if current.day in w:
-					week_of_month = idx + 1
-					break
-			
-			weekday_index = current.weekday()
-			belongs_to_month = True
-
-			#checks if the date is a "spillover" day
-			cal_row = month_calendar[week_of_month - 1]
-			if cal_row[weekday_index] == 0:
-				belongs_to_month = False
-				
-			working = 1 if belongs_to_month else 0
-
-			#skip the weekends
-			if weekday_index < 5:
-				#write on the file
-				writer.writerow([
-					current.strftime("%Y-%m-%d"),
-					current.strftime("%A"),
-					current.strftime("%B"),
-					week_index,
-					working
-				])
-
-			if weekday_index == 6:
-				week_index += 1
-
-			current += timedelta(days=1)
+	#written aside and swapped in, so a reader (the warm-up thread, another terminal) never sees half a file
+	fd, temp_path = tempfile.mkstemp(dir=DATA_PATH, suffix=".tmp")
+	with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+		f.write("\r\n".join(lines) + "\r\n")
+	os.replace(temp_path, filepath)
 
 	return filepath
 
+#pre-generates the files for count years starting at start
+def ensure_year_files(start: int, count: int = 1):
+	return [ensure_year_file(year) for year in range(start, start + count)]
+
+#one row per weekday of the year: date, day name, month name, week number, working flag.
+#each month's layout is computed once instead of once per day.
+def _year_rows(year: int):
+	week_index = 1
+	day_names = [calendar.day_name[i] for i in range(5)]
+
+	for month in range(1, 13):
+		#2d representation of a month, 0 = the day belongs to the previous/next month
+		month_calendar = calendar.monthcalendar(year, month)
+		month_name = date(year, month, 1).strftime("%B")
+
+		for week in month_calendar:
+			for weekday_index, day in enumerate(week):
+				#spillover days are written by the month they belong to
+				if day == 0:
+					continue
+
+				#skip the weekends
+				if weekday_index < 5:
+					yield (
+						f"{year:04d}-{month:02d}-{day:02d}",
+						day_names[weekday_index],
+						month_name,
+						week_index,
+						1 #only days of their own month get here, so they're always working days
+					)
+
+				if weekday_index == 6:
+					week_index += 1
+
+#parsed copy of a year file. It's read once and kept in memory, every query after that
+#is a bisect over the sorted dates (no file I/O and no strptime per row)
+class YearCalendar:
+
+	def __init__(self, year: int):
+		self.year = year
+		self.rows = []
+		self.dates = []
+
+		with open(ensure_year_file(year), "r", encoding="utf-8") as f:
+			for row in csv.DictReader(f):
+				row["dt"] = date.fromisoformat(row["date"])
+				self.rows.append(row)
+
+		#the file is written in order, but a hand edited one might not be
+		self.rows.sort(key=lambda r: r["dt"])
+		self.dates = [r["dt"] for r in self.rows]
+
+	#rows between start and end, both included
+	def between(self, start: date, end: date):
+		lo = bisect_left(self.dates, start)
+		hi = bisect_right(self.dates, end)
+		return self.rows[lo:hi]
+
+	#working days of a month
+	def month(self, month: int):
+		start = date(self.year, month, 1)
+		end = date(self.year, month, calendar.monthrange(self.year, month)[1])
+		return [r for r in self.between(start, end) if r["working_day"] == "1"]
+
+_calendars = {}
+
+def get_calendar(year: int):
+	if year not in _calendars:
+		_calendars[year] = YearCalendar(year)
+	return _calendars[year]
+
 #read just the current date + 2 weeks from now
 def read_filtered(year: int, full_view: bool = False):
-	filepath = ensure_year_file(year)
+	cal = get_calendar(year)
+
+	if full_view:
+		return list(cal.rows)
 
 	today = datetime.now().date()
 	two_weeks_from_now = today + timedelta(days=14)
 
-	rows = []
-
-	with open(filepath, "r", encoding="utf-8") as f:
-		reader = csv.DictReader(f)
-
-		for row in reader:
-			row_date = datetime.strptime(row["date"], "%Y-%m-%d").date()
+	rows = cal.between(today, two_weeks_from_now)
 
-			if full_view:
-				rows.append(row)
-			else:
-				if today <= row_date <= two_weeks_from_now:
-					rows.append(row)
+	#late december also needs the first days of next year
+	if two_weeks_from_now.year > year:
+		rows = rows + get_calendar(two_weeks_from_now.year).between(today, two_weeks_from_now)
 
 	return rows
 
+#True for a day that's in its year file as a working day
+def is_working_day(day: date):
+	rows = get_calendar(day.year).between(day, day)
+	return bool(rows) and rows[0]["working_day"] == "1"
+
 #read entire month
 def read_month(year: int, month: int):
-	filepath = ensure_year_file(year)
-
-	rows = []
+	return get_calendar(year).month(month)
 
-	with open(filepath, "r", encoding="utf-8") as f:
-		reader = csv.DictReader(f)
+if __name__ == "__main__":
+	import argparse
 
-		for row in reader:
-			row_date = datetime.strptime(row["date"], "%Y-%m-%d").date()
+	parser = argparse.ArgumentParser(description="Pre-generate the yearly calendar files.")
+	parser.add_argument("start", type=int, nargs="?", default=datetime.now().year, help="first year (default: current year)")
+	parser.add_argument("count", type=int, nargs="?", default=1, help="how many years to generate")
+	args = parser.parse_args()
 
-			if row_date.month == month:
-				if row["working_day"] == "1":
-					rows.append(row)
-
-	return rows
+	for path in ensure_year_files(args.start, args.count):
+		print(path)